@@ -1,6 +1,5 @@
 import streamlit as st
 import os
-import re
 from pathlib import Path
 import json
 from voice_generator import VoiceGenerator
@@ -9,6 +8,12 @@ from background_generator import BackgroundGenerator
 from character_animator import CharacterAnimator
 from camera_controller import CameraController
 from video_composer import VideoComposer
+from script_parser import ScriptParseCache, load_characters
+from timeline import Timeline
+from pipelined_renderer import PipelinedRenderPipeline
+from progressive_output import ProgressiveWriter, serve_streams, player_html, PLAYLIST_NAME
+
+STREAM_ROOT = os.path.join("output", "streams")
 
 # Page config
 st.set_page_config(
@@ -23,7 +28,9 @@ if 'characters' not in st.session_state:
 if 'script' not in st.session_state:
     st.session_state.script = ""
 if 'parsed_script' not in st.session_state:
-    st.session_state.parsed_script = []
+    st.session_state.parsed_script = Timeline()
+if 'parse_cache' not in st.session_state:
+    st.session_state.parse_cache = ScriptParseCache()
 if 'voice_generator' not in st.session_state:
     st.session_state.voice_generator = VoiceGenerator()
 if 'enhanced_voice' not in st.session_state:
@@ -36,80 +43,28 @@ if 'camera' not in st.session_state:
     st.session_state.camera = CameraController()
 if 'composer' not in st.session_state:
     st.session_state.composer = VideoComposer()
+if 'pipeline' not in st.session_state:
+    # Renders frames from predicted durations while TTS is still running
+    st.session_state.pipeline = PipelinedRenderPipeline(
+        voice_generator=st.session_state.voice_generator,
+        bg_generator=st.session_state.bg_generator,
+        animator=st.session_state.animator,
+        camera=st.session_state.camera,
+        composer=st.session_state.composer
+    )
 if 'voice_assignments' not in st.session_state:
     st.session_state.voice_assignments = {}
 if 'audio_files' not in st.session_state:
     st.session_state.audio_files = []
 if 'generated_scenes' not in st.session_state:
     st.session_state.generated_scenes = []
+if 'render_job' not in st.session_state:
+    st.session_state.render_job = None
 
-def load_characters():
-    """Load character images from characters folder"""
-    characters_dir = Path("characters")
-    characters_dir.mkdir(exist_ok=True)
-    
-    characters = {}
-    for img_file in characters_dir.glob("*"):
-        if img_file.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif']:
-            char_name = img_file.stem.lower()
-            characters[char_name] = str(img_file)
-    
-    return characters
-
-def parse_script(script_text):
-    """Parse script to identify speakers and dialogue"""
-    lines = script_text.strip().split('\n')
-    parsed = []
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        
-        # Pattern 1: "Hi, I'm John" - extract speaker from dialogue
-        if "I'm" in line or "I am" in line:
-            name_match = re.search(r"I[''`]?m\s+([A-Z][a-z]+)", line)
-            if name_match:
-                speaker = name_match.group(1).lower()
-                parsed.append({
-                    'speaker': speaker,
-                    'dialogue': line,
-                    'original_line': line
-                })
-                continue
-        
-        # Pattern 2: "Sarah replied:" or "John said:"
-        speaker_match = re.search(r'([A-Z][a-z]+)\s+(replied|said):', line)
-        if speaker_match:
-            speaker = speaker_match.group(1).lower()
-            dialogue = re.sub(r'^[^:]+:\s*', '', line).strip()
-            parsed.append({
-                'speaker': speaker,
-                'dialogue': dialogue,
-                'original_line': line
-            })
-            continue
-        
-        # Pattern 3: "Sarah: dialogue"
-        colon_match = re.search(r'^([A-Z][a-z]+):\s*(.+)', line)
-        if colon_match:
-            speaker = colon_match.group(1).lower()
-            dialogue = colon_match.group(2).strip()
-            parsed.append({
-                'speaker': speaker,
-                'dialogue': dialogue,
-                'original_line': line
-            })
-            continue
-        
-        # Default: treat as narrator
-        parsed.append({
-            'speaker': 'narrator',
-            'dialogue': line,
-            'original_line': line
-        })
-    
-    return parsed
+@st.cache_resource
+def stream_server():
+    """One local HTTP server per process for every session's playlists"""
+    return serve_streams(STREAM_ROOT)
 
 def main():
     st.title("🎬 AI Video Generator")
@@ -184,20 +139,24 @@ Sarah: I'm doing great, thanks for asking!"""
         
         if script_text != st.session_state.script:
             st.session_state.script = script_text
-            st.session_state.parsed_script = parse_script(script_text)
+            st.session_state.parsed_script = st.session_state.parse_cache.parse(script_text)
         
         if st.button("🔍 Parse Script", type="primary"):
-            st.session_state.parsed_script = parse_script(script_text)
+            st.session_state.parsed_script = st.session_state.parse_cache.parse(script_text)
     
     with col2:
         st.header("🎭 Script Analysis")
         
         if st.session_state.parsed_script:
+            timeline = st.session_state.parsed_script
+            render_speaker_summary(timeline)
+            
             st.subheader("Detected Dialogue:")
             
-            for i, item in enumerate(st.session_state.parsed_script):
-                speaker = item['speaker']
-                dialogue = item['dialogue']
+            # Only the visible page of lines gets widgets, so reruns stay flat as scripts grow
+            for line in visible_lines(timeline):
+                speaker = line.speaker
+                dialogue = line.dialogue
                 
                 # Check if character image exists
                 char_status = "✅" if speaker in st.session_state.characters else "❌"
@@ -205,17 +164,19 @@ Sarah: I'm doing great, thanks for asking!"""
                 with st.expander(f"{char_status} {speaker.title()}: {dialogue[:50]}..."):
                     st.write(f"**Speaker:** {speaker.title()}")
                     st.write(f"**Dialogue:** {dialogue}")
-                    st.write(f"**Original:** {item['original_line']}")
+                    st.write(f"**Original:** {line.original_line}")
                     
                     if speaker not in st.session_state.characters and speaker != 'narrator':
                         st.warning(f"No image found for character '{speaker}'")
+                    
+                    render_preview(line)
         
         # Voice assignment section
         st.header("🎤 Voice Assignment")
         
         if st.session_state.parsed_script:
             voices = st.session_state.voice_generator.get_available_voices()
-            speakers = list(set([item['speaker'] for item in st.session_state.parsed_script]))
+            speakers = st.session_state.parsed_script.speakers
             
             for speaker in speakers:
                 if speaker != 'narrator':
@@ -235,50 +196,186 @@ Sarah: I'm doing great, thanks for asking!"""
         # Video generation section
         st.header("🎬 Video Generation")
         
-        if st.session_state.audio_files:
+        # The render synthesizes any missing audio itself, overlapped with frame rendering
+        if st.session_state.parsed_script and st.session_state.voice_assignments:
+            progressive = st.checkbox("📺 Watch while rendering", key="progressive_mode")
             if st.button("🚀 Generate Video", type="primary"):
-                generate_video()
+                start_render(progressive)
+            if st.session_state.render_job:
+                render_job_status()
+        else:
+            st.info("Assign voices first")
+
+def render_speaker_summary(timeline):
+    """Per-speaker line counts, read straight from the timeline's speaker index"""
+    summary = []
+    for speaker in timeline.speakers:
+        summary.append({
+            'Speaker': speaker.title(),
+            'Lines': len(timeline.by_speaker[speaker]),
+            'Image': "✅" if speaker in st.session_state.characters else "❌"
+        })
+    st.table(summary)
+
+def visible_lines(timeline, page_size=25):
+    """Lines on the selected page, optionally filtered to one speaker"""
+    options = ["All"] + timeline.speakers
+    # Keep widget state valid when an edit removes a speaker or shortens the script
+    if st.session_state.get("analysis_speaker", "All") not in options:
+        st.session_state.analysis_speaker = "All"
+    
+    filter_col, page_col = st.columns([1, 1])
+    with filter_col:
+        speaker = st.selectbox("Speaker:", options,
+                               format_func=lambda s: s if s == "All" else s.title(),
+                               key="analysis_speaker")
+    
+    if speaker == "All":
+        indexes = range(len(timeline))
+    else:
+        indexes = timeline.by_speaker[speaker]
+    
+    pages = max(1, -(-len(indexes) // page_size))
+    if st.session_state.get("analysis_page", 1) > pages:
+        st.session_state.analysis_page = pages
+    with page_col:
+        page = st.number_input(f"Page (of {pages}):", min_value=1, max_value=pages,
+                               step=1, key="analysis_page")
+    
+    start = (page - 1) * page_size
+    return [timeline[i] for i in indexes[start:start + page_size]]
+
+def preview_plan():
+    """Voiced selection and scene plan as render_episode builds them, cached per script
+
+    Returns (voiced, line_scenes, full_lookup, by_source) where by_source
+    maps a script line index to its line in the voiced selection.
+    """
+    import hashlib
+    timeline = st.session_state.parsed_script
+    voices = st.session_state.voice_assignments
+    key = (hashlib.sha1(st.session_state.script.encode('utf-8')).hexdigest(), tuple(sorted(voices)))
+    cached = st.session_state.get('preview_plan')
+    if cached and cached[0] == key:
+        return cached[1]
+
+    planner = st.session_state.pipeline.planner
+    voiced = timeline.select(voices)
+    line_scenes = planner.selection_lookup(timeline, voiced)
+    plan = (voiced, line_scenes, planner.scene_lookup(timeline.scenes),
+            {line.source_index: line for line in voiced})
+    st.session_state.preview_plan = (key, plan)
+    return plan
+
+def render_preview(line):
+    """Render a single-frame poster preview for one script line"""
+    duration = st.session_state.enhanced_voice.get_audio_duration(line.dialogue, line.speaker)
+    timestamp = st.slider(
+        "Preview time (s):", 0.0, float(duration), 0.0, 0.1,
+        key=f"preview_t_{line.index}"
+    )
+    
+    if st.button("🖼️ Preview Frame", key=f"preview_{line.index}"):
+        import time
+        pipeline = st.session_state.pipeline
+        voiced, line_scenes, full_lookup, by_source = preview_plan()
+        
+        # Frame the line exactly as the render will: same numbering, total and scene
+        voiced_line = by_source.get(line.index)
+        if voiced_line is None:
+            st.caption("This line has no voice assigned, so it won't appear in the video")
+            target, total, scene = line, len(st.session_state.parsed_script), full_lookup[line.index]
         else:
-            st.info("Generate audio first")
+            target, total, scene = voiced_line, len(voiced), line_scenes[voiced_line.index]
+        
+        start = time.perf_counter()
+        frame = pipeline.render_frame(target, total, st.session_state.characters, timestamp, scene=scene)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        st.image(frame, caption=f"Frame at {timestamp:.1f}s ({elapsed_ms:.0f} ms)", use_column_width=True)
 
 def generate_audio():
     """Generate audio from parsed script"""
     # Fast mock audio generation for testing
     audio_files = []
     
-    for i, item in enumerate(st.session_state.parsed_script):
-        speaker = item['speaker']
-        dialogue = item['dialogue']
-        
-        if speaker in st.session_state.voice_assignments:
-            audio_files.append({
-                'speaker': speaker,
-                'dialogue': dialogue,
-                'audio_path': f"mock_audio_{i}.wav",
-                'order': i
-            })
+    for line in st.session_state.parsed_script:
+        if line.speaker in st.session_state.voice_assignments:
+            line.audio_path = f"mock_audio_{line.index}.wav"
+            audio_files.append(line)
     
     st.session_state.audio_files = audio_files
     st.success(f"Generated {len(audio_files)} audio files!")
     
     # Display mock audio info
     for audio in audio_files:
-        st.write(f"🎵 **{audio['speaker'].title()}**: {audio['dialogue']}")
-        st.caption(f"Voice: {st.session_state.voice_assignments[audio['speaker']]}")
+        st.write(f"🎵 **{audio.speaker.title()}**: {audio.dialogue}")
+        st.caption(f"Voice: {st.session_state.voice_assignments[audio.speaker]}")
 
-def generate_video():
-    """Generate video from audio and characters"""
-    with st.spinner("Generating video..."):
-        progress_bar = st.progress(0)
-        
-        # Simulate video generation process
-        import time
-        for i in range(100):
-            time.sleep(0.02)
-            progress_bar.progress(i + 1)
-        
-        st.success("Video generated successfully!")
-        st.info("Phase 3 will implement actual video creation with character animation")
+def start_render(progressive=False):
+    """Render the episode in the background, optionally publishing scenes as they finish"""
+    import threading
+    import uuid
+    job = st.session_state.render_job
+    if job and job['thread'].is_alive():
+        st.warning("A render is already running")
+        return
+
+    stream_id = uuid.uuid4().hex[:12]
+    writer = None
+    if progressive:
+        writer = ProgressiveWriter(os.path.join(STREAM_ROOT, stream_id), fps=st.session_state.pipeline.fps)
+    job = {'stream_id': stream_id, 'writer': writer, 'result': None, 'error': None}
+
+    def run(pipeline, timeline, characters, voices):
+        try:
+            job['result'] = pipeline.render_episode(
+                timeline, characters, voices,
+                os.path.join("output", f"episode_{stream_id}.mp4"),
+                progressive=writer
+            )
+        except Exception as e:
+            job['error'] = e
+
+    # Session state is not reachable from a plain thread, so hand it what it needs
+    job['thread'] = threading.Thread(
+        target=run,
+        args=(st.session_state.pipeline, st.session_state.parsed_script,
+              dict(st.session_state.characters), dict(st.session_state.voice_assignments)),
+        daemon=True
+    )
+    job['thread'].start()
+    st.session_state.render_job = job
+
+def render_job_status():
+    """Show the session's background render and, if progressive, its growing playlist"""
+    import streamlit.components.v1 as components
+    job = st.session_state.render_job
+    writer = job['writer']
+
+    if job['error']:
+        st.error(f"Render failed: {job['error']}")
+    elif job['result'] and job['result']['output_path']:
+        st.success(f"Video generated: {job['result']['output_path']}")
+    elif job['result']:
+        # finish_episode returns no path when nothing had audio or the merge failed
+        st.error(f"Render finished without a video ({job['result']['scenes']} scenes rendered)")
+    else:
+        if writer:
+            st.info(f"Rendering... {writer.published_seconds:.0f} s ready to watch")
+        else:
+            st.info("Rendering...")
+        if st.button("🔄 Refresh progress"):
+            st.rerun()
+
+    if not writer:
+        return
+    if writer.error:
+        st.warning(f"Watch-while-rendering stopped early ({writer.error}); the video itself is unaffected")
+    if writer.entries:
+        port = stream_server().server_address[1]
+        playlist_url = f"http://localhost:{port}/{job['stream_id']}/{PLAYLIST_NAME}"
+        components.html(player_html(playlist_url), height=400)
+        st.caption(f"Playlist: {playlist_url}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,39 @@
+import os
+import shutil
+from render_checkpoint import file_checksum
+from atomic_io import atomic_write
+
+class ArtifactStore:
+    """Checksummed file store on a directory every node can reach"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Artifact key escapes the store: {key}")
+        return path
+
+    def put(self, local_path, key):
+        """Upload a file under key, returning its checksum record"""
+        dest = self._path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        checksum = file_checksum(local_path)
+        # Copy then rename so readers never see a partial upload
+        with atomic_write(dest) as tmp_path:
+            shutil.copyfile(local_path, tmp_path)
+            if file_checksum(tmp_path) != checksum:
+                raise IOError(f"Checksum mismatch uploading {local_path}")
+        return {'key': key, 'sha256': checksum, 'size': os.path.getsize(dest)}
+
+    def get(self, record, local_path=None):
+        """Return a verified path to an artifact, copying it to local_path if given"""
+        path = self._path(record['key'])
+        if not os.path.exists(path) or file_checksum(path) != record['sha256']:
+            raise IOError(f"Artifact {record['key']} is missing or corrupt")
+        if local_path is None:
+            return path
+        shutil.copyfile(path, local_path)
+        return local_path
@@ -0,0 +1,32 @@
+import os
+import threading
+from contextlib import contextmanager
+
+def temp_path(final_path, suffix=""):
+    """Temp name beside final_path that no other process or thread will pick"""
+    return f"{final_path}.{os.getpid()}.{threading.get_ident()}.tmp{suffix}"
+
+@contextmanager
+def atomic_write(final_path, suffix=""):
+    """Yield a temp path to write; it replaces final_path when the block succeeds
+
+    Readers only ever see the previous file or the complete new one. The
+    temp file is removed if the block raises. ``suffix`` keeps an
+    extension for writers that pick their format from the file name.
+    """
+    tmp = temp_path(final_path, suffix)
+    try:
+        yield tmp
+        os.replace(tmp, final_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def write_text(path, text, fsync=False):
+    """Atomically replace a text file, optionally syncing it to disk first"""
+    with atomic_write(path) as tmp:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import threading
+import time
+import wave
+import numpy as np
+from enhanced_voice import VOICE_PROFILES, DEFAULT_PROFILE
+from atomic_io import atomic_write
+
+class AudioConditioner:
+    """Trim silence, normalize loudness and apply profile gain to TTS clips"""
+
+    def __init__(self, target_dbfs=-20.0, silence_dbfs=-45.0, window_ms=10,
+                 pad_ms=60, output_dir=os.path.join("audio", "conditioned")):
+        self.target_dbfs = target_dbfs
+        self.silence_dbfs = silence_dbfs
+        self.window_ms = window_ms
+        self.pad_ms = pad_ms
+        self.output_dir = output_dir
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+
+    def process(self, samples, sample_rate, gain=1.0):
+        """Condition float samples in [-1, 1] with whole-array NumPy operations"""
+        if samples.size == 0:
+            return samples
+
+        # RMS envelope over fixed windows, computed with one reshape
+        window = max(1, int(sample_rate * self.window_ms / 1000))
+        n_windows = -(-samples.size // window)
+        padded = np.zeros(n_windows * window, dtype=np.float32)
+        padded[:samples.size] = samples
+        energy = np.square(padded).reshape(n_windows, window).mean(axis=1)
+
+        threshold = 10 ** (self.silence_dbfs / 10)  # Compared against mean power
+        voiced = np.flatnonzero(energy > threshold)
+        if voiced.size == 0:
+            return samples[:0]
+
+        pad = int(sample_rate * self.pad_ms / 1000)
+        start = max(0, voiced[0] * window - pad)
+        end = min(samples.size, (voiced[-1] + 1) * window + pad)
+        trimmed = samples[start:end]
+
+        # Normalize the voiced windows' RMS to the target, then apply profile gain
+        rms = np.sqrt(energy[voiced].mean())
+        scale = (10 ** (self.target_dbfs / 20)) / rms * gain
+        return np.clip(trimmed * scale, -1.0, 1.0)
+
+    def profile_gain(self, speaker):
+        """Relative level for a character, taken from its voice profile volume"""
+        if speaker is None:
+            return 1.0
+        return VOICE_PROFILES.get(speaker.lower(), DEFAULT_PROFILE)['volume']
+
+    def condition(self, audio_path, speaker=None):
+        """Return a conditioned copy of a WAV file, cached by input digest"""
+        gain = self.profile_gain(speaker)
+        digest = hashlib.sha1()
+        with open(audio_path, 'rb') as f:
+            digest.update(f.read())
+        digest.update(f"{self.target_dbfs}|{self.silence_dbfs}|{self.window_ms}|{self.pad_ms}|{gain}".encode())
+        output_path = os.path.join(self.output_dir, f"cond_{digest.hexdigest()[:16]}.wav")
+        if os.path.exists(output_path):
+            return output_path
+
+        try:
+            samples, sample_rate, channels = read_wav(audio_path)
+        except (wave.Error, EOFError, ValueError) as e:
+            print(f"Error reading audio {audio_path}: {e}")
+            return audio_path
+
+        start = time.process_time()
+        conditioned = self.process(samples, sample_rate, gain)
+        elapsed = time.process_time() - start
+
+        with self._lock:
+            self.audio_seconds += samples.size / sample_rate
+            self.cpu_seconds += elapsed
+
+        if conditioned.size == 0:
+            # Nothing above the silence floor; keep the clip as generated
+            return audio_path
+
+        # Write under a temp name so a concurrent reader never sees half a file
+        with atomic_write(output_path) as tmp_path:
+            write_wav(tmp_path, conditioned, sample_rate, channels)
+        return output_path
+
+    def throughput(self):
+        """Audio-seconds conditioned per CPU-second so far"""
+        return self.audio_seconds / self.cpu_seconds if self.cpu_seconds else 0.0
+
+def read_wav(path):
+    """Read a PCM WAV file as mono float32 samples in [-1, 1]"""
+    with wave.open(path, 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        sample_rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported sample width: {width}")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, sample_rate, 1
+
+def write_wav(path, samples, sample_rate, channels=1):
+    """Write float samples in [-1, 1] as 16-bit PCM"""
+    pcm = (samples * 32767).astype('<i2')
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+
+def benchmark(clips=50, clip_seconds=4.0, sample_rate=22050):
+    """Measure conditioning throughput on synthetic speech-like clips"""
+    conditioner = AudioConditioner()
+    rng = np.random.default_rng(0)
+    n = int(clip_seconds * sample_rate)
+    t = np.arange(n, dtype=np.float32) / sample_rate
+    envelope = ((t > 0.5) & (t < clip_seconds - 0.7)).astype(np.float32)
+    clip = (0.3 * np.sin(2 * np.pi * 180 * t) * envelope
+            + rng.normal(0, 0.001, n).astype(np.float32))
+
+    start = time.process_time()
+    for _ in range(clips):
+        conditioner.process(clip, sample_rate, gain=0.9)
+    cpu_seconds = time.process_time() - start
+
+    audio_seconds = clips * clip_seconds
+    return {
+        'audio_seconds': audio_seconds,
+        'cpu_seconds': cpu_seconds,
+        'throughput': audio_seconds / cpu_seconds if cpu_seconds else float('inf')
+    }
+
+if __name__ == "__main__":
+    result = benchmark()
+    print(f"Conditioned {result['audio_seconds']:.0f} s of audio in {result['cpu_seconds']:.3f} CPU s "
+          f"({result['throughput']:.0f} audio-s per CPU-s)")
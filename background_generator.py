@@ -2,28 +2,70 @@ import requests
 import os
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
+import threading
+from atomic_io import atomic_write
 
 class BackgroundGenerator:
+    # Checked in order; the first setting with a keyword in the text wins
+    SETTING_KEYWORDS = {
+        'office': ('office', 'work'),
+        'outdoor': ('park', 'outside')
+    }
+    
     def __init__(self):
         self.output_dir = "backgrounds"
         os.makedirs(self.output_dir, exist_ok=True)
+        # Backgrounds only depend on the setting, so one file per setting
+        # is shared by every scene (and every episode in a batch)
+        self._cache = {}
+        self._images = {}
+        self._lock = threading.Lock()
+    
+    def detect_setting(self, dialogue):
+        """Pick a setting from location keywords in the text"""
+        text = dialogue.lower()
+        for setting, keywords in self.SETTING_KEYWORDS.items():
+            if any(keyword in text for keyword in keywords):
+                return setting
+        return "neutral"
     
     def generate_scene_background(self, dialogue, scene_type="indoor"):
         """Generate AI background based on dialogue context"""
+        return self.generate_setting_background(self.detect_setting(dialogue))
+    
+    def generate_setting_background(self, setting):
+        """Generate (once) the background image for a setting"""
         # Simple procedural background generation
         width, height = 1920, 1080
         
-        if "office" in dialogue.lower() or "work" in dialogue.lower():
-            bg = self._create_office_bg(width, height)
-        elif "park" in dialogue.lower() or "outside" in dialogue.lower():
-            bg = self._create_outdoor_bg(width, height)
-        else:
-            bg = self._create_neutral_bg(width, height)
-        
-        filename = f"bg_{hash(dialogue) % 10000}.png"
-        filepath = os.path.join(self.output_dir, filename)
-        bg.save(filepath)
-        return filepath
+        with self._lock:
+            if setting in self._cache:
+                return self._cache[setting]
+            
+            if setting == "office":
+                bg = self._create_office_bg(width, height)
+            elif setting == "outdoor":
+                bg = self._create_outdoor_bg(width, height)
+            else:
+                bg = self._create_neutral_bg(width, height)
+            
+            filename = f"bg_{setting}.png"
+            filepath = os.path.join(self.output_dir, filename)
+            # Save then rename so other jobs sharing the directory never read a partial file
+            with atomic_write(filepath, suffix=".png") as tmp_path:
+                bg.save(tmp_path)
+            self._cache[setting] = filepath
+            return filepath
+    
+    def load_background(self, filepath):
+        """Load a generated background once and keep it in memory"""
+        with self._lock:
+            img = self._images.get(filepath)
+            if img is None:
+                with Image.open(filepath) as f:
+                    img = f.convert('RGB')
+                self._images[filepath] = img
+            return img
     
     def _create_office_bg(self, w, h):
         img = Image.new('RGB', (w, h), (240, 240, 245))
@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from script_parser import parse_script, load_characters
+from render_pipeline import RenderPipeline
+from pipelined_renderer import PipelinedRenderPipeline
+from caption_renderer import CaptionRenderer
+from workspace import JobWorkspace
+
+class BatchRenderer:
+    """Render every episode listed in a JSONL manifest on a shared worker pool
+
+    Each manifest line is a JSON object such as::
+
+        {"id": "ep001", "script_path": "scripts/ep001.txt",
+         "characters_dir": "characters", "voices": {"john": "<voice id>"},
+         "output": "output/ep001.mp4"}
+
+    ``script`` may be given inline instead of ``script_path`` and
+    ``characters`` (name -> image path) instead of ``characters_dir``.
+    """
+
+    def __init__(self, manifest_path, workers=2, pipeline=None):
+        self.manifest_path = Path(manifest_path)
+        self.progress_path = Path(f"{manifest_path}.progress.jsonl")
+        self.workers = workers
+        # One pipeline means one set of background, sprite and TTS caches
+        self.pipeline = pipeline or RenderPipeline()
+        self._progress_lock = threading.Lock()
+
+    def load_manifest(self):
+        """Read episode entries from the manifest"""
+        episodes = []
+        with open(self.manifest_path, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                entry.setdefault('id', f"episode_{line_no:04d}")
+                entry.setdefault('output', os.path.join("output", f"{entry['id']}.mp4"))
+                episodes.append(entry)
+        return episodes
+
+    def load_completed(self):
+        """Return ids of episodes already rendered by a previous run"""
+        completed = {}
+        if not self.progress_path.exists():
+            return completed
+
+        with open(self.progress_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write leaves a torn last line
+                    continue
+                if record.get('output_path') and os.path.exists(record['output_path']):
+                    completed[record['id']] = record
+        return completed
+
+    def _record_progress(self, record):
+        with self._progress_lock:
+            with open(self.progress_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def render_episode(self, entry):
+        """Render one manifest entry and record it as completed"""
+        if 'script' in entry:
+            script_text = entry['script']
+        else:
+            script_text = Path(entry['script_path']).read_text(encoding='utf-8')
+
+        characters = entry.get('characters') or load_characters(entry.get('characters_dir', "characters"))
+        os.makedirs(os.path.dirname(entry['output']) or ".", exist_ok=True)
+
+        start = time.perf_counter()
+        # Each episode gets private scratch, so concurrent episodes never share temp files
+        with JobWorkspace(entry['id']) as workspace:
+            result = self.pipeline.render_episode(
+                parse_script(script_text), characters, entry.get('voices', {}), entry['output'],
+                workspace=workspace)
+        wall_seconds = time.perf_counter() - start
+
+        record = {
+            'id': entry['id'],
+            'output_path': result['output_path'],
+            'scenes': result['scenes'],
+            'video_seconds': result['video_seconds'],
+            'wall_seconds': wall_seconds,
+            'throughput': result['video_seconds'] / wall_seconds if wall_seconds else 0.0
+        }
+        if result['output_path']:
+            self._record_progress(record)
+        return record
+
+    def run(self):
+        """Render all pending episodes and return a throughput report"""
+        episodes = self.load_manifest()
+        completed = self.load_completed()
+        pending = [entry for entry in episodes if entry['id'] not in completed]
+
+        records = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.render_episode, entry): entry for entry in pending}
+            for future in as_completed(futures):
+                entry = futures[future]
+                try:
+                    record = future.result()
+                except Exception as e:
+                    print(f"Error rendering episode {entry['id']}: {e}")
+                    record = {'id': entry['id'], 'output_path': None, 'error': str(e)}
+                records.append(record)
+        wall_seconds = time.perf_counter() - start
+
+        # Throughput is minutes of video per wall-clock minute, so the
+        # minute units cancel and seconds can be divided directly
+        video_seconds = sum(r.get('video_seconds', 0.0) for r in records)
+        return {
+            'episodes': records,
+            'skipped': sorted(completed),
+            'rendered': sum(1 for r in records if r['output_path']),
+            'failed': sum(1 for r in records if not r['output_path']),
+            'video_minutes': video_seconds / 60,
+            'wall_minutes': wall_seconds / 60,
+            'throughput': video_seconds / wall_seconds if wall_seconds else 0.0,
+            'audio_throughput': self.pipeline.conditioner.throughput()
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Render episodes from a JSONL manifest")
+    parser.add_argument("manifest", help="path to the JSONL manifest")
+    parser.add_argument("--workers", type=int, default=2, help="episodes rendered in parallel")
+    parser.add_argument("--captions", action="store_true", help="burn dialogue captions into the video")
+    parser.add_argument("--keep-frames", action="store_true",
+                        help="keep raw frame caches so scenes can be re-encoded without re-rendering")
+    parser.add_argument("--overlap-tts", type=int, metavar="WORKERS", default=0,
+                        help="render frames from predicted durations on WORKERS threads while TTS runs")
+    args = parser.parse_args()
+
+    options = {
+        'captions': CaptionRenderer() if args.captions else None,
+        'keep_frames': args.keep_frames
+    }
+    if args.overlap_tts:
+        pipeline = PipelinedRenderPipeline(workers=args.overlap_tts, **options)
+    else:
+        pipeline = RenderPipeline(**options)
+    report = BatchRenderer(args.manifest, workers=args.workers, pipeline=pipeline).run()
+    for record in report['episodes']:
+        if record['output_path']:
+            print(f"{record['id']}: {record['video_seconds'] / 60:.2f} min video in "
+                  f"{record['wall_seconds'] / 60:.2f} min ({record['throughput']:.2f}x)")
+        else:
+            print(f"{record['id']}: failed")
+    print(f"Rendered {report['rendered']}, failed {report['failed']}, "
+          f"skipped {len(report['skipped'])} already complete")
+    print(f"Aggregate: {report['video_minutes']:.2f} min video in "
+          f"{report['wall_minutes']:.2f} min ({report['throughput']:.2f}x)")
+    print(f"Audio conditioning: {report['audio_throughput']:.0f} audio-s per CPU-s")
+
+if __name__ == "__main__":
+    main()
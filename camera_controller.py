@@ -13,16 +13,19 @@ class CameraController:
             'left': (-200, -100, 1.5),
             'right': (200, -100, 1.5)
         }
+        # (plate key, camera position) -> zoomed and cropped background
+        self._plate_cache = {}
     
     def get_camera_movement(self, scene_index, total_scenes):
         """Generate camera movement for scene"""
         movements = ['wide', 'medium', 'close', 'left', 'right']
         return movements[scene_index % len(movements)]
     
-    def apply_camera_effect(self, background_img, character_frames, camera_pos):
-        """Apply camera positioning and movement"""
-        if not character_frames:
-            return [np.array(background_img)]
+    def prepare_plate(self, background_img, camera_pos, plate_key=None):
+        """Zoom and crop the background for a shot, reusing cached plates"""
+        cache_key = (plate_key, camera_pos)
+        if plate_key is not None and cache_key in self._plate_cache:
+            return self._plate_cache[cache_key]
         
         x_offset, y_offset, zoom = self.positions.get(camera_pos, (0, 0, 1.0))
         
@@ -38,28 +41,41 @@ class CameraController:
             crop_y = max(0, (new_h - self.height) // 2 + y_offset)
             bg = bg.crop((crop_x, crop_y, crop_x + self.width, crop_y + self.height))
         
-        # Composite character onto background
-        result_frames = []
-        for char_frame in character_frames:
-            # Convert character frame to PIL
-            char_pil = Image.fromarray(char_frame)
-            
-            # Create composite
-            composite = bg.copy()
-            
-            # Position character (center-right for conversation)
-            char_x = self.width - char_pil.width - 100 + x_offset
-            char_y = self.height - char_pil.height - 50 + y_offset
-            
-            # Paste character with transparency handling
-            if char_pil.mode == 'RGBA':
-                composite.paste(char_pil, (char_x, char_y), char_pil)
-            else:
-                composite.paste(char_pil, (char_x, char_y))
-            
-            result_frames.append(np.array(composite))
+        if plate_key is not None:
+            self._plate_cache[cache_key] = bg
+        return bg
+    
+    def composite_frame(self, plate, char_frame, camera_pos):
+        """Composite one character frame onto a prepared shot plate"""
+        x_offset, y_offset, _ = self.positions.get(camera_pos, (0, 0, 1.0))
+        
+        # Convert character frame to PIL
+        char_pil = Image.fromarray(char_frame)
         
-        return result_frames
+        # Create composite
+        composite = plate.copy()
+        
+        # Position character (center-right for conversation)
+        char_x = self.width - char_pil.width - 100 + x_offset
+        char_y = self.height - char_pil.height - 50 + y_offset
+        
+        # Paste character with transparency handling
+        if char_pil.mode == 'RGBA':
+            composite.paste(char_pil, (char_x, char_y), char_pil)
+        else:
+            composite.paste(char_pil, (char_x, char_y))
+        
+        return np.array(composite)
+    
+    def apply_camera_effect(self, background_img, character_frames, camera_pos, plate_key=None):
+        """Apply camera positioning and movement"""
+        if not character_frames:
+            return [np.array(background_img)]
+        
+        bg = self.prepare_plate(background_img, camera_pos, plate_key)
+        
+        # Composite character onto background
+        return [self.composite_frame(bg, char_frame, camera_pos) for char_frame in character_frames]
     
     def create_transition(self, from_pos, to_pos, frames=12):
         """Create smooth camera transition"""
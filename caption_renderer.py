@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+class CaptionRenderer:
+    """Burn captions into frames from strips rasterized once per caption"""
+
+    def __init__(self, font_path="DejaVuSans.ttf", font_size=42, max_width=1500,
+                 bottom_margin=60, padding=16, max_strips=64):
+        self.font_path = font_path
+        self.font_size = font_size
+        self.max_width = max_width
+        self.bottom_margin = bottom_margin
+        self.padding = padding
+        # (text, font, size, width) -> (premultiplied rgb, 255 - alpha), both uint8.
+        # A strip is only reused within its own scene, so a small LRU is enough
+        # even when one renderer is shared by every episode of a batch
+        self.max_strips = max_strips
+        self._strip_cache = OrderedDict()
+        self._fonts = {}
+        self._lock = threading.Lock()
+
+    def _load_font(self, font_path, size):
+        key = (font_path, size)
+        if key not in self._fonts:
+            try:
+                self._fonts[key] = ImageFont.truetype(font_path, size)
+            except OSError:
+                self._fonts[key] = ImageFont.load_default()
+        return self._fonts[key]
+
+    def _wrap(self, text, font, max_width):
+        """Greedy word wrap to the strip width"""
+        measure = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+        lines = []
+        current = ""
+        for word in text.split():
+            candidate = f"{current} {word}".strip()
+            if current and measure.textlength(candidate, font=font) > max_width:
+                lines.append(current)
+                current = word
+            else:
+                current = candidate
+        if current:
+            lines.append(current)
+        return lines
+
+    def rasterize(self, text):
+        """Return the cached caption strip for text, drawing it on first use"""
+        key = (text, self.font_path, self.font_size, self.max_width)
+        with self._lock:
+            strip = self._strip_cache.get(key)
+            if strip is not None:
+                self._strip_cache.move_to_end(key)
+                return strip
+
+            font = self._load_font(self.font_path, self.font_size)
+            lines = self._wrap(text, font, self.max_width - 2 * self.padding) or [""]
+            measure = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+            line_height = self.font_size + self.font_size // 4
+            text_width = max(int(measure.textlength(line, font=font)) for line in lines)
+
+            w = text_width + 2 * self.padding
+            h = line_height * len(lines) + 2 * self.padding
+            img = Image.new('RGBA', (w, h), (0, 0, 0, 150))  # Translucent box
+            draw = ImageDraw.Draw(img)
+            for i, line in enumerate(lines):
+                line_w = int(draw.textlength(line, font=font))
+                x = (w - line_w) // 2
+                y = self.padding + i * line_height
+                draw.text((x + 2, y + 2), line, font=font, fill=(0, 0, 0, 255))  # Shadow
+                draw.text((x, y), line, font=font, fill=(255, 255, 255, 255))
+
+            rgba = np.asarray(img, dtype=np.uint16)
+            alpha = rgba[:, :, 3:4]
+            premult = ((rgba[:, :, :3] * alpha + 127) // 255).astype(np.uint8)
+            strip = (premult, (255 - alpha).astype(np.uint8))
+            self._strip_cache[key] = strip
+            if len(self._strip_cache) > self.max_strips:
+                self._strip_cache.popitem(last=False)
+            return strip
+
+    def overlay(self, frame, text):
+        """Alpha blend the caption strip into the frame's bounding box in place"""
+        if not text:
+            return frame
+
+        premult, inv_alpha = self.rasterize(text)
+        h, w = inv_alpha.shape[:2]
+        frame_h, frame_w = frame.shape[:2]
+        x = max(0, (frame_w - w) // 2)
+        y = max(0, frame_h - h - self.bottom_margin)
+        h, w = min(h, frame_h - y), min(w, frame_w - x)
+
+        region = frame[y:y + h, x:x + w, :3]
+        background = np.multiply(region, inv_alpha[:h, :w], dtype=np.uint16)
+        background += 127
+        background //= 255
+        background += premult[:h, :w]
+        region[:] = background
+        return frame
+
+    def overlay_frames(self, frames, text):
+        """Burn the same caption into every frame of a scene"""
+        for frame in frames:
+            self.overlay(frame, text)
+        return frames
+
+def build_cues(lines, durations):
+    """Build (start, end, text) caption cues from consecutive line durations"""
+    cues = []
+    start = 0.0
+    for text, duration in zip(lines, durations):
+        cues.append((start, start + duration, text))
+        start += duration
+    return cues
+
+def _format_timestamp(seconds, separator):
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+def write_srt(cues, output_path):
+    """Export caption cues as an SRT sidecar"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for i, (start, end, text) in enumerate(cues, 1):
+            f.write(f"{i}\n{_format_timestamp(start, ',')} --> {_format_timestamp(end, ',')}\n{text}\n\n")
+    return output_path
+
+def write_vtt(cues, output_path):
+    """Export caption cues as a WebVTT sidecar"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write("WEBVTT\n\n")
+        for start, end, text in cues:
+            f.write(f"{_format_timestamp(start, '.')} --> {_format_timestamp(end, '.')}\n{text}\n\n")
+    return output_path
+
+def benchmark(frames=96, width=1920, height=1080):
+    """Measure caption burn-in cost as a percentage of compositing time"""
+    from camera_controller import CameraController
+
+    camera = CameraController(width, height)
+    background = Image.new('RGB', (width, height), (200, 200, 210))
+    sprite = np.full((600, 400, 3), 128, dtype=np.uint8)
+    captions = CaptionRenderer()
+    text = "Thanks John, good to meet you too! How has the new office been treating you?"
+
+    start = time.perf_counter()
+    composited = camera.apply_camera_effect(background, [sprite] * frames, 'medium')
+    compose_seconds = time.perf_counter() - start
+
+    captions.rasterize(text)
+    start = time.perf_counter()
+    captions.overlay_frames(composited, text)
+    caption_seconds = time.perf_counter() - start
+
+    return {
+        'frames': frames,
+        'compose_ms_per_frame': compose_seconds / frames * 1000,
+        'caption_ms_per_frame': caption_seconds / frames * 1000,
+        'overhead_percent': caption_seconds / compose_seconds * 100 if compose_seconds else 0.0
+    }
+
+if __name__ == "__main__":
+    result = benchmark()
+    print(f"Compositing: {result['compose_ms_per_frame']:.2f} ms/frame")
+    print(f"Captions:    {result['caption_ms_per_frame']:.2f} ms/frame "
+          f"(+{result['overhead_percent']:.1f}%)")
@@ -2,40 +2,58 @@ import cv2
 import numpy as np
 from PIL import Image, ImageDraw
 import os
+import threading
 
 class CharacterAnimator:
     def __init__(self):
         self.output_dir = "animations"
         os.makedirs(self.output_dir, exist_ok=True)
+        self._sprite_cache = {}
+        self._frame_cache = {}
+        self._lock = threading.Lock()
+    
+    def load_sprite(self, char_image_path):
+        """Load and resize a character image once, then reuse it"""
+        with self._lock:
+            sprite = self._sprite_cache.get(char_image_path)
+            if sprite is None:
+                sprite = Image.open(char_image_path)
+                sprite = sprite.resize((400, 600))
+                self._sprite_cache[char_image_path] = sprite
+            return sprite
     
     def animate_character(self, char_image_path, dialogue, duration=3.0):
         """Create character animation with lip sync"""
         if not os.path.exists(char_image_path):
             return None
         
-        # Load character image
-        char_img = Image.open(char_image_path)
-        char_img = char_img.resize((400, 600))
-        
         frames = []
         fps = 24
         total_frames = int(duration * fps)
         
         for frame_num in range(total_frames):
+            frames.append(self.get_frame(char_image_path, dialogue, frame_num))
+        
+        return frames
+    
+    def get_frame(self, char_image_path, dialogue, frame_num):
+        """Return the animation frame for frame_num, built once per mouth state"""
+        # Simple lip sync animation
+        mouth_open = len(dialogue) > 0 and (frame_num % 8) < 4  # Open/close cycle
+        key = (char_image_path, mouth_open)
+        
+        frame_array = self._frame_cache.get(key)
+        if frame_array is None:
             # Create animated frame
-            frame = char_img.copy()
-            
-            # Simple lip sync animation
-            if len(dialogue) > 0:
-                mouth_open = (frame_num % 8) < 4  # Open/close cycle
-                if mouth_open:
-                    frame = self._add_mouth_animation(frame)
+            frame = self.load_sprite(char_image_path).copy()
+            if mouth_open:
+                frame = self._add_mouth_animation(frame)
             
-            # Convert to numpy array for video
+            # Convert to numpy array for video; frames are shared, so read-only
             frame_array = np.array(frame)
-            frames.append(frame_array)
-        
-        return frames
+            frame_array.setflags(write=False)
+            self._frame_cache[key] = frame_array
+        return frame_array
     
     def _add_mouth_animation(self, img):
         """Add simple mouth movement"""
@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from render_broker import SQLiteBroker
+from artifact_store import ArtifactStore
+from render_pipeline import RenderPipeline, get_wav_duration
+from script_parser import parse_script, load_characters
+from timeline import Line, Scene
+from workspace import JobWorkspace
+
+class RenderCoordinator:
+    """Split a render into scene tasks, then stitch the workers' segments"""
+
+    def __init__(self, broker, store, pipeline=None):
+        self.broker = broker
+        self.store = store
+        self.pipeline = pipeline or RenderPipeline()
+
+    def submit(self, job_id, timeline, characters, voice_assignments):
+        """Queue one task per voiced line and return the voiced timeline"""
+        voiced = timeline.select(voice_assignments)
+        line_scenes = self.pipeline.planner.selection_lookup(timeline, voiced)
+
+        # Workers may not see this machine's disk, so character images travel via the store
+        uploaded = {}
+        for speaker in voiced.speakers:
+            char_path = characters.get(speaker)
+            if char_path and os.path.exists(char_path):
+                key = f"{job_id}/characters/{speaker}{os.path.splitext(char_path)[1]}"
+                uploaded[speaker] = self.store.put(char_path, key)
+
+        tasks = []
+        for line in voiced:
+            scene = line_scenes[line.index]
+            tasks.append({
+                'index': line.index,
+                'total': len(voiced),
+                'speaker': line.speaker,
+                'dialogue': line.dialogue,
+                'voice_id': voice_assignments[line.speaker],
+                'character': uploaded.get(line.speaker),
+                'setting': scene.setting,
+                'shot': scene.shots[line.source_index]
+            })
+        self.broker.submit(job_id, tasks)
+        return voiced
+
+    def wait(self, job_id, poll_interval=2.0):
+        """Block until no task of the job is pending or leased"""
+        while True:
+            status = self.broker.status(job_id)
+            if not status.get('pending') and not status.get('leased'):
+                return status
+            time.sleep(poll_interval)
+
+    def stitch(self, job_id, voiced, output_path, workspace=None):
+        """Verify every segment's checksum and merge them in script order"""
+        errors = self.broker.errors(job_id)
+        if errors:
+            index, error = sorted(errors.items())[0]
+            raise RuntimeError(f"{len(errors)} scene(s) failed; scene {index}: {error}")
+
+        segments = {}
+        for index, result in self.broker.results(job_id).items():
+            if index >= len(voiced):
+                continue  # Left over from an earlier, longer version of the job
+            segments[index] = self.store.get(result['artifact'])
+            voiced.set_duration(index, result['duration'])
+        return self.pipeline.finish_episode(voiced, segments, output_path, workspace)
+
+    def run(self, job_id, timeline, characters, voice_assignments, output_path, poll_interval=2.0):
+        """Submit, wait for and stitch a whole job"""
+        voiced = self.submit(job_id, timeline, characters, voice_assignments)
+        self.wait(job_id, poll_interval)
+        with JobWorkspace(job_id) as workspace:
+            return self.stitch(job_id, voiced, output_path, workspace)
+
+class RenderWorker:
+    """Pull scene tasks from the broker, render them and upload the segments"""
+
+    def __init__(self, broker, store, pipeline=None, worker_id=None, lease_seconds=120):
+        self.broker = broker
+        self.store = store
+        self.pipeline = pipeline or RenderPipeline()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+
+    def _keep_lease(self, task, done):
+        # Renew well before expiry so a slow encode isn't mistaken for a dead worker
+        while not done.wait(self.lease_seconds / 3):
+            if not self.broker.renew(task, self.lease_seconds):
+                return
+
+    def render_task(self, task, workspace):
+        """Render one leased task and return its broker result"""
+        payload = task['payload']
+        line = Line(payload['index'], 0, payload['speaker'], payload['dialogue'])
+        scene = Scene(0, payload['setting'],
+                      self.pipeline.bg_generator.generate_setting_background(payload['setting']))
+        scene.shots[line.index] = payload['shot']
+
+        characters = {}
+        if payload['character']:
+            name = os.path.basename(payload['character']['key'])
+            characters[line.speaker] = self.store.get(payload['character'], workspace.path(name))
+
+        if not self.pipeline.synthesize(line, payload['voice_id']):
+            raise RuntimeError(f"No audio for scene {line.index}")
+
+        segment_path = workspace.path(f"scene_{line.index:03d}.mp4")
+        if not self.pipeline.render_scene(line, payload['total'], characters, segment_path,
+                                          scene, workspace.subdir("compose")):
+            raise RuntimeError(f"Scene {line.index} failed to render: {line.dialogue[:50]}")
+
+        artifact = self.store.put(segment_path, f"{task['job_id']}/scene_{line.index:03d}.mp4")
+        return {'artifact': artifact, 'duration': get_wav_duration(line.audio_path), 'worker': self.worker_id}
+
+    def run_once(self):
+        """Process one task; False when the queue had nothing to lease"""
+        task = self.broker.lease(self.worker_id, self.lease_seconds)
+        if task is None:
+            return False
+
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._keep_lease, args=(task, done), daemon=True)
+        heartbeat.start()
+        try:
+            with JobWorkspace(f"{task['job_id']}_{task['index']}") as workspace:
+                result = self.render_task(task, workspace)
+            if not self.broker.complete(task, result):
+                print(f"Lease on scene {task['index']} of {task['job_id']} was lost; result dropped")
+        except Exception as e:
+            print(f"Error rendering scene {task['index']} of {task['job_id']}: {e}")
+            self.broker.fail(task, e)
+        finally:
+            done.set()
+            heartbeat.join()
+        return True
+
+    def run(self, poll_interval=2.0, exit_when_idle=False):
+        """Work until stopped, or until the queue is empty if exit_when_idle"""
+        while True:
+            if not self.run_once():
+                if exit_when_idle:
+                    return
+                time.sleep(poll_interval)
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed scene rendering")
+    parser.add_argument("--broker", default="render_queue.db", help="SQLite broker file")
+    parser.add_argument("--store", default="shared_store", help="shared artifact directory")
+    sub = parser.add_subparsers(dest="role", required=True)
+
+    coord = sub.add_parser("coordinator", help="split a script into tasks and stitch the result")
+    coord.add_argument("script", help="script text file")
+    coord.add_argument("output", help="output video path")
+    coord.add_argument("--voices", required=True, help="JSON file mapping speaker to voice id")
+    coord.add_argument("--characters-dir", default="characters")
+    coord.add_argument("--job-id", help="job id (reuse one to resume a job)")
+    coord.add_argument("--local-workers", type=int, default=0,
+                       help="also run this many workers in-process, for single-machine runs")
+
+    work = sub.add_parser("worker", help="pull and render scene tasks")
+    work.add_argument("--worker-id")
+    work.add_argument("--exit-when-idle", action="store_true")
+
+    args = parser.parse_args()
+    broker = SQLiteBroker(args.broker)
+    store = ArtifactStore(args.store)
+
+    if args.role == "worker":
+        RenderWorker(broker, store, worker_id=args.worker_id).run(exit_when_idle=args.exit_when_idle)
+        return
+
+    with open(args.voices, encoding='utf-8') as f:
+        voices = json.load(f)
+    job_id = args.job_id or f"{Path(args.script).stem}-{uuid.uuid4().hex[:8]}"
+    coordinator = RenderCoordinator(broker, store)
+
+    # In-process workers share the coordinator's pipeline and its caches
+    for _ in range(args.local_workers):
+        worker = RenderWorker(broker, store, pipeline=coordinator.pipeline)
+        threading.Thread(target=worker.run, daemon=True).start()
+
+    timeline = parse_script(Path(args.script).read_text(encoding='utf-8'))
+    result = coordinator.run(job_id, timeline, load_characters(args.characters_dir), voices, args.output)
+    print(f"{job_id}: {result['scenes']} scenes, {result['video_seconds']:.1f} s -> {result['output_path']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import json
+import os
+import threading
+from atomic_io import write_text
+from enhanced_voice import estimate_duration
+
+class DurationModel:
+    """Predict line durations per voice and rate, calibrated from past clips
+
+    Until a voice/rate pair has enough history, predictions fall back to
+    the words-per-minute estimate used by EnhancedVoiceGenerator.
+    """
+
+    def __init__(self, stats_path=os.path.join("audio", "duration_stats.json"), min_words=20):
+        self.stats_path = stats_path
+        self.min_words = min_words
+        self._lock = threading.Lock()
+        self.stats = {}  # "voice|rate" -> {'words': n, 'seconds': s, 'clips': c}
+        if os.path.exists(stats_path):
+            try:
+                with open(stats_path, encoding='utf-8') as f:
+                    self.stats = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Ignoring unreadable duration stats {stats_path}: {e}")
+
+    def _key(self, voice_id, rate):
+        return f"{voice_id}|{rate}"
+
+    def predict(self, text, voice_id, rate=180):
+        """Expected audio length of text in seconds"""
+        words = len(text.split())
+        with self._lock:
+            entry = self.stats.get(self._key(voice_id, rate))
+        if entry and entry['words'] >= self.min_words:
+            return max(words * entry['seconds'] / entry['words'], 1.0)
+        return estimate_duration(text, rate)
+
+    def record(self, text, voice_id, seconds, rate=180):
+        """Add a finished clip's measured length to the calibration"""
+        words = len(text.split())
+        if not words or seconds <= 0:
+            return
+        with self._lock:
+            entry = self.stats.setdefault(self._key(voice_id, rate), {'words': 0, 'seconds': 0.0, 'clips': 0})
+            entry['words'] += words
+            entry['seconds'] += seconds
+            entry['clips'] += 1
+
+    def save(self):
+        """Persist calibration atomically for future runs"""
+        os.makedirs(os.path.dirname(self.stats_path) or ".", exist_ok=True)
+        # Held through the replace so concurrent episodes save one at a time
+        with self._lock:
+            write_text(self.stats_path, json.dumps(self.stats, indent=2))
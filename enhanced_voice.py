@@ -3,6 +3,22 @@ import os
 from pathlib import Path
 import json
 
+# Character-specific voice profiles
+VOICE_PROFILES = {
+    'john': {'rate': 160, 'volume': 0.9, 'pitch': 0},
+    'sarah': {'rate': 150, 'volume': 0.8, 'pitch': 50},
+    'mike': {'rate': 140, 'volume': 1.0, 'pitch': -20},
+    'emma': {'rate': 155, 'volume': 0.85, 'pitch': 30}
+}
+DEFAULT_PROFILE = {'rate': 150, 'volume': 0.9, 'pitch': 0}
+
+def estimate_duration(text, rate):
+    """Estimate spoken duration of text at a pyttsx3 rate"""
+    words_per_minute = rate * 0.8  # Approximate
+    word_count = len(text.split())
+    duration = (word_count / words_per_minute) * 60
+    return max(duration, 1.0)  # Minimum 1 second
+
 class EnhancedVoiceGenerator:
     def __init__(self):
         self.engine = pyttsx3.init()
@@ -13,12 +29,7 @@ class EnhancedVoiceGenerator:
     
     def _load_voice_profiles(self):
         """Load character-specific voice profiles"""
-        return {
-            'john': {'rate': 160, 'volume': 0.9, 'pitch': 0},
-            'sarah': {'rate': 150, 'volume': 0.8, 'pitch': 50},
-            'mike': {'rate': 140, 'volume': 1.0, 'pitch': -20},
-            'emma': {'rate': 155, 'volume': 0.85, 'pitch': 30}
-        }
+        return {name: dict(profile) for name, profile in VOICE_PROFILES.items()}
     
     def get_character_voice(self, character_name):
         """Get optimized voice settings for character"""
@@ -29,7 +40,7 @@ class EnhancedVoiceGenerator:
             profile = self.character_voices[char_lower]
         else:
             # Default profile
-            profile = {'rate': 150, 'volume': 0.9, 'pitch': 0}
+            profile = dict(DEFAULT_PROFILE)
         
         # Select appropriate system voice
         female_voices = [v for v in self.voices if 'female' in v.name.lower()]
@@ -68,7 +79,4 @@ class EnhancedVoiceGenerator:
     def get_audio_duration(self, text, character_name):
         """Estimate audio duration for timing"""
         _, profile = self.get_character_voice(character_name)
-        words_per_minute = profile['rate'] * 0.8  # Approximate
-        word_count = len(text.split())
-        duration = (word_count / words_per_minute) * 60
-        return max(duration, 1.0)  # Minimum 1 second
\ No newline at end of file
+        return estimate_duration(text, profile['rate'])
\ No newline at end of file
@@ -0,0 +1,147 @@
+import argparse
+import bisect
+import json
+import os
+import struct
+import cv2
+import numpy as np
+from atomic_io import temp_path
+
+MAGIC = b'YTFRAMES'
+TRAILER = struct.Struct('<Q8s')  # metadata length, magic
+
+class FrameCacheWriter:
+    """Append composited frames to a raw, memory-mappable frame file
+
+    Layout: unique frames as packed uint8 BGR arrays starting at offset 0,
+    then a JSON metadata block, then a fixed trailer with the metadata
+    length. Consecutive identical frames are stored once and recorded as
+    a run, so a held shot costs one frame of disk.
+    """
+
+    def __init__(self, path, fps=24, audio_path=None):
+        self.path = path
+        self.fps = fps
+        self.audio_path = audio_path
+        self.shape = None
+        self.runs = []  # [unique frame index, repeat count]
+        self._unique = 0
+        self._last = None
+        self._tmp_path = temp_path(path)
+        self._file = open(self._tmp_path, 'wb')
+
+    def append(self, frame):
+        """Add one RGB frame, extending the current run if it repeats"""
+        if self._last is not None and (frame is self._last or np.array_equal(frame, self._last)):
+            self.runs[-1][1] += 1
+            return
+
+        if self.shape is None:
+            self.shape = frame.shape
+        elif frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match {self.shape}")
+
+        # Stored as BGR so the encoder can hand slices straight to OpenCV
+        self._file.write(np.ascontiguousarray(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)).tobytes())
+        self.runs.append([self._unique, 1])
+        self._unique += 1
+        self._last = frame
+
+    def close(self):
+        """Write metadata and move the finished file into place"""
+        height, width, channels = self.shape or (0, 0, 3)
+        meta = json.dumps({
+            'width': width,
+            'height': height,
+            'channels': channels,
+            'fps': self.fps,
+            'unique_frames': self._unique,
+            'total_frames': sum(count for _, count in self.runs),
+            'runs': self.runs,
+            'audio_path': self.audio_path,
+            'channel_order': 'BGR'
+        }).encode('utf-8')
+        self._file.write(meta)
+        self._file.write(TRAILER.pack(len(meta), MAGIC))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+def write_frame_cache(frames, path, fps=24, audio_path=None):
+    """Store a list of RGB frames as a frame cache file"""
+    writer = FrameCacheWriter(path, fps, audio_path)
+    for frame in frames:
+        writer.append(frame)
+    return writer.close()
+
+class FrameCache:
+    """Read-only, memory-mapped view of a frame cache file"""
+
+    def __init__(self, path):
+        self.path = path
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            f.seek(size - TRAILER.size)
+            meta_len, magic = TRAILER.unpack(f.read(TRAILER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a frame cache")
+            f.seek(size - TRAILER.size - meta_len)
+            self.meta = json.loads(f.read(meta_len).decode('utf-8'))
+
+        self.fps = self.meta['fps']
+        shape = (self.meta['unique_frames'], self.meta['height'], self.meta['width'], self.meta['channels'])
+        self.frames = np.memmap(path, dtype=np.uint8, mode='r', shape=shape) if shape[0] else None
+
+        # Cumulative start frame of each run, for frame -> run lookups
+        self._run_starts = []
+        total = 0
+        for _, count in self.meta['runs']:
+            self._run_starts.append(total)
+            total += count
+
+    def __len__(self):
+        return self.meta['total_frames']
+
+    def frame(self, index):
+        """BGR frame at a timeline position, as a view into the mapping"""
+        run = bisect.bisect_right(self._run_starts, index) - 1
+        return self.frames[self.meta['runs'][run][0]]
+
+    def iter_runs(self, start=0, end=None):
+        """Yield (frame view, repeat count) runs clipped to [start, end)"""
+        end = len(self) if end is None else min(end, len(self))
+        if start >= end:
+            return
+        first = bisect.bisect_right(self._run_starts, start) - 1
+        for run in range(first, len(self.meta['runs'])):
+            run_start = self._run_starts[run]
+            if run_start >= end:
+                break
+            unique, count = self.meta['runs'][run]
+            count = min(run_start + count, end) - max(run_start, start)
+            yield self.frames[unique], count
+
+    def close(self):
+        # The mapping is released once the last view of it is dropped
+        self.frames = None
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-encode a scene from its frame cache")
+    parser.add_argument("cache", help="path to a .frames file")
+    parser.add_argument("output", help="output video path")
+    parser.add_argument("--audio", help="audio to mux (defaults to the one recorded in the cache)")
+    parser.add_argument("--size", help="output size as WIDTHxHEIGHT")
+    parser.add_argument("--start", type=int, default=0, help="first frame to keep")
+    parser.add_argument("--end", type=int, help="frame to stop before")
+    parser.add_argument("--codec", default="libx264")
+    args = parser.parse_args()
+
+    from video_composer import VideoComposer
+    size = tuple(int(v) for v in args.size.split('x')) if args.size else None
+    result = VideoComposer().encode_frame_cache(
+        args.cache, args.output, audio_path=args.audio, size=size,
+        start=args.start, end=args.end, codec=args.codec)
+    print(result or "Encoding failed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import argparse
+import os
+import resource
+import shutil
+import time
+from multiprocessing import Pool
+from streamlit.testing.v1 import AppTest
+
+SPEAKER_LINES = [
+    "Hi, I'm John. Nice to meet you!",
+    "Sarah replied: Thanks John, good to meet you too!",
+    "John said: How are you doing today?",
+    "Sarah: I'm doing great, thanks for asking!",
+    "The two of them walk to the park outside the office."
+]
+
+def make_script(n_lines):
+    """Synthetic script of n_lines cycling through every speaker pattern"""
+    return "\n".join(SPEAKER_LINES[i % len(SPEAKER_LINES)] for i in range(n_lines))
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+def _rss_mb():
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError):
+        # No procfs: fall back to the peak, which ru_maxrss gives in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _timed_run(at, timings, action, timeout):
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    timings.setdefault(action, []).append((time.perf_counter() - start) * 1000)
+    if at.exception:
+        raise RuntimeError(f"{action} raised: {at.exception[0].value}")
+
+def run_session(args):
+    """One simulated editor: load, edit scripts, add a character, generate audio
+
+    Runs in a fresh process. A throwaway first run pays for the app's
+    imports, so the RSS growth measured afterwards is this session's own
+    state, which is what each extra editor adds to a server.
+    """
+    session_id, app_path, sizes, edits, timeout = args
+    timings = {}
+
+    AppTest.from_file(app_path, default_timeout=timeout).run(timeout=timeout)
+    baseline_mb = _rss_mb()
+
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    _timed_run(at, timings, 'load', timeout)
+
+    for size in sizes:
+        script = make_script(size)
+        for edit in range(edits):
+            # Each keystroke-sized edit changes the last line, like typing would
+            at.text_area[0].set_value(f"{script}\nJohn: edit {edit}")
+            _timed_run(at, timings, f'edit_{size}', timeout)
+
+    # The uploader can't be driven headlessly, so save the file the way
+    # "Save All Characters" does and rerun to pick it up
+    char_path = os.path.join("characters", f"loadtest{session_id}.png")
+    shutil.copyfile(os.path.join("characters", "john.png"), char_path)
+    try:
+        _timed_run(at, timings, 'character_upload', timeout)
+    finally:
+        os.remove(char_path)
+
+    buttons = [b for b in at.button if "Generate Audio" in b.label]
+    if buttons:
+        buttons[0].click()
+        _timed_run(at, timings, 'generate_audio', timeout)
+
+    # Measured while the AppTest, and so its session state, is still alive
+    return {
+        'session': session_id,
+        'timings': timings,
+        'memory_mb': _rss_mb() - baseline_mb
+    }
+
+def run_load_test(sessions=4, sizes=(10, 100, 500), edits=3, app_path="app.py", timeout=60):
+    """Run concurrent sessions, one process each, and aggregate the results
+
+    AppTest swaps a process-global Streamlit runtime on every run, so
+    sessions can't share a process. The latencies are therefore those of
+    N editors competing for CPU, not for one server's GIL; per-session
+    memory is what to multiply out when sizing a single server.
+    """
+    jobs = [(i, app_path, list(sizes), edits, timeout) for i in range(sessions)]
+    start = time.perf_counter()
+    # One task per child, so every session starts from a clean process
+    with Pool(processes=sessions, maxtasksperchild=1) as pool:
+        results = pool.map(run_session, jobs, chunksize=1)
+    wall_seconds = time.perf_counter() - start
+
+    memory = [r['memory_mb'] for r in results]
+    latencies = {}
+    for result in results:
+        for action, values in result['timings'].items():
+            latencies.setdefault(action, []).extend(values)
+
+    return {
+        'sessions': sessions,
+        'wall_seconds': wall_seconds,
+        'latency_ms': {
+            action: {
+                'runs': len(values),
+                'p50': percentile(values, 50),
+                'p90': percentile(values, 90),
+                'p99': percentile(values, 99),
+                'max': max(values)
+            }
+            for action, values in latencies.items()
+        },
+        'memory_mb': {
+            'mean': sum(memory) / len(memory) if memory else 0.0,
+            'max': max(memory) if memory else 0.0
+        }
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Streamlit app with concurrent headless sessions")
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent simulated editors")
+    parser.add_argument("--sizes", default="10,100,500", help="comma-separated script sizes in lines")
+    parser.add_argument("--edits", type=int, default=3, help="edits per script size")
+    parser.add_argument("--app", default="app.py", help="Streamlit script to test")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds allowed per rerun")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    report = run_load_test(args.sessions, sizes, args.edits, args.app, args.timeout)
+
+    print(f"{report['sessions']} sessions in {report['wall_seconds']:.1f} s")
+    print(f"{'action':<20}{'runs':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for action, stats in report['latency_ms'].items():
+        print(f"{action:<20}{stats['runs']:>6}{stats['p50']:>10.0f}{stats['p90']:>10.0f}"
+              f"{stats['p99']:>10.0f}{stats['max']:>10.0f}")
+    print(f"Per-session memory: mean {report['memory_mb']['mean']:.1f} MB, "
+          f"max {report['memory_mb']['max']:.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from render_pipeline import RenderPipeline, get_wav_duration
+from duration_model import DurationModel
+
+class PipelinedRenderPipeline(RenderPipeline):
+    """RenderPipeline that renders frames while TTS is still running
+
+    Frames for each line are composited from a predicted duration as soon
+    as a render worker is free. TTS runs on its own thread in script order.
+    When a line's real audio arrives, only the frame tail is padded or
+    trimmed before encoding, so wall time approaches max(TTS, render)
+    rather than their sum.
+    """
+
+    def __init__(self, *args, workers=2, duration_model=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.workers = workers
+        self.duration_model = duration_model or DurationModel()
+
+    def _synthesize_timed(self, line, voice_id):
+        audio_path = self.synthesize(line, voice_id)
+        if not audio_path:
+            return None
+        seconds = get_wav_duration(audio_path)
+        self.duration_model.record(line.dialogue, voice_id, seconds)
+        return seconds
+
+    def _render_line(self, line, total, characters, voice_id, scene, audio_future, scene_path, temp_dir):
+        start = time.perf_counter()
+        predicted = self.duration_model.predict(line.dialogue, voice_id)
+        frames = self.render_frames(line, total, characters, self.scene_frame_count(predicted), scene)
+
+        seconds = audio_future.result()
+        if seconds is None:
+            return None  # No audio, so the line is skipped like render_episode does
+
+        self.fit_frames(frames, line, total, characters, self.scene_frame_count(seconds), scene)
+        if not self.encode_scene(line, frames, scene_path, temp_dir):
+            raise RuntimeError(f"Scene {line.index} failed to render: {line.dialogue[:50]}")
+        return seconds, predicted, time.perf_counter() - start
+
+    def render_episode(self, timeline, characters, voice_assignments, output_path, workspace=None,
+                       progressive=None):
+        """Render a timeline with TTS and frame rendering overlapped"""
+        temp_dir = workspace.subdir("compose") if workspace else None
+        scene_dir, voiced, checkpoint, line_scenes = self._prepare_episode(
+            timeline, characters, voice_assignments, output_path)
+
+        segments = {}
+        pending = []
+        if progressive:
+            progressive.begin([line.index for line in voiced])
+        try:
+            for line in voiced:
+                segment = self._reuse_checkpointed(line, voiced, checkpoint)
+                if segment:
+                    segments[line.index] = segment
+                    if progressive:
+                        progressive.add(line.index, segment)
+                else:
+                    pending.append(line)
+
+            # Plates are shared by the workers, so build them before any start
+            scenes = {}
+            for line in pending:
+                scene = line_scenes[line.index]
+                scenes.setdefault(scene.index, scene)
+            for scene in scenes.values():
+                self.planner.prepare_plates(scene)
+
+            errors = []
+            prediction_error = []
+            # pyttsx3 is serialized anyway, so one TTS thread feeds every render worker
+            with ThreadPoolExecutor(max_workers=1) as tts_pool, \
+                    ThreadPoolExecutor(max_workers=self.workers) as render_pool:
+                audio_futures = {
+                    line.index: tts_pool.submit(self._synthesize_timed, line,
+                                                voice_assignments[line.speaker])
+                    for line in pending
+                }
+                render_futures = {
+                    render_pool.submit(
+                        self._render_line, line, len(voiced), characters,
+                        voice_assignments[line.speaker], line_scenes[line.index],
+                        audio_futures[line.index],
+                        os.path.join(scene_dir, f"scene_{line.index:03d}.mp4"), temp_dir
+                    ): line
+                    for line in pending
+                }
+
+                # Checkpoint from this thread only, as scenes finish in any order
+                for future in as_completed(render_futures):
+                    line = render_futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    if result is None:
+                        if progressive:
+                            progressive.skip(line.index)
+                        continue
+                    seconds, predicted, render_seconds = result
+                    voiced.set_duration(line.index, seconds)
+                    scene_path = os.path.join(scene_dir, f"scene_{line.index:03d}.mp4")
+                    checkpoint.record(line.index, line.speaker, line.dialogue, line.audio_path,
+                                      scene_path, seconds, render_seconds)
+                    segments[line.index] = scene_path
+                    prediction_error.append(abs(seconds - predicted))
+                    if progressive:
+                        # Scenes are held until all earlier ones are in the playlist
+                        progressive.add(line.index, scene_path)
+
+            self.duration_model.save()
+            if errors:
+                # Finished scenes are checkpointed; a rerun picks up the rest
+                raise errors[0]
+        finally:
+            # Close the playlist even when a scene fails, so players stop polling
+            if progressive:
+                progressive.finish()
+
+        summary = self.finish_episode(voiced, segments, output_path, workspace)
+        if prediction_error:
+            summary['mean_prediction_error'] = sum(prediction_error) / len(prediction_error)
+        return summary
@@ -0,0 +1,208 @@
+import csv
+import functools
+import math
+import os
+import queue
+import subprocess
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from moviepy.config import get_setting
+from atomic_io import write_text
+
+PLAYLIST_NAME = "playlist.m3u8"
+
+class ProgressiveWriter:
+    """Publish finished scenes as HLS segments behind a growing playlist
+
+    Scenes may finish in any order; each is cut into segments of at most
+    ``segment_seconds`` as soon as every scene before it has been
+    published, so the playlist only ever grows at its end. Timestamps
+    carry on from scene to scene, and the playlist is closed with
+    ``EXT-X-ENDLIST`` by ``finish``.
+
+    Segmenting re-encodes each scene, so it runs on a background thread
+    and the calls made by the renderer only queue work. A failure marks
+    the stream broken (``error``) and stops publishing; it never reaches
+    the render, whose own segments are unaffected.
+    """
+
+    def __init__(self, stream_dir, segment_seconds=4, fps=24):
+        self.stream_dir = stream_dir
+        self.segment_seconds = segment_seconds
+        self.fps = fps
+        self.playlist_path = os.path.join(stream_dir, PLAYLIST_NAME)
+        self.entries = []  # (segment name, seconds) in playlist order
+        self.published_seconds = 0.0
+        self.finished = False
+        self.error = None
+        self._order = []
+        self._ready = {}
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        os.makedirs(stream_dir, exist_ok=True)
+
+    def begin(self, indices):
+        """Start a fresh playlist for scenes published in the given order"""
+        self._submit('begin', list(indices))
+
+    def add(self, index, segment_path):
+        """Queue a finished scene; it is published once every earlier scene is"""
+        self._submit('add', (index, segment_path))
+
+    def skip(self, index):
+        """Drop a scene that will never be rendered so later ones aren't held back"""
+        self._submit('skip', index)
+
+    def finish(self):
+        """Close the playlist, after queued scenes, so players stop polling"""
+        self._submit('finish', None)
+
+    def wait(self):
+        """Block until every queued scene has been published"""
+        self._queue.join()
+
+    def _submit(self, op, arg):
+        with self._lock:
+            self._queue.put((op, arg))
+            # The publisher exits after finish, so a reused writer starts a new one
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            op, arg = self._queue.get()
+            try:
+                self._apply(op, arg)
+            except Exception as e:
+                self.error = e
+                print(f"Progressive stream {self.stream_dir} stopped: {e}")
+            finally:
+                self._queue.task_done()
+            if op == 'finish':
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+
+    def _apply(self, op, arg):
+        if op == 'begin':
+            for name in os.listdir(self.stream_dir):
+                if name.endswith(".ts") or name.endswith(".csv"):
+                    os.remove(os.path.join(self.stream_dir, name))
+            self._order = arg
+            self._ready = {}
+            self.entries = []
+            self.published_seconds = 0.0
+            self.finished = False
+            self.error = None
+            self._write_playlist()
+        elif op == 'add':
+            index, segment_path = arg
+            self._ready[index] = segment_path
+            self._publish_ready()
+        elif op == 'skip':
+            if arg in self._order:
+                self._order.remove(arg)
+            self._publish_ready()
+        elif op == 'finish':
+            self.finished = True
+            self._write_playlist()
+
+    def _publish_ready(self):
+        # A broken stream stays as far as it got; later scenes would leave a gap
+        while self.error is None and self._order and self._order[0] in self._ready:
+            index = self._order.pop(0)
+            self._segment_scene(index, self._ready.pop(index))
+            self._write_playlist()
+
+    def _segment_scene(self, index, segment_path):
+        list_path = os.path.join(self.stream_dir, f"scene_{index:03d}.csv")
+        # Keyframes on the segment grid give fixed-length segments; the
+        # offset keeps timestamps continuous across scene boundaries
+        cmd = [
+            get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+            "-i", segment_path,
+            "-c:v", "libx264", "-preset", "veryfast", "-r", str(self.fps),
+            "-force_key_frames", f"expr:gte(t,n_forced*{self.segment_seconds})",
+            "-c:a", "aac",
+            "-f", "segment", "-segment_time", str(self.segment_seconds),
+            "-segment_format", "mpegts",
+            "-segment_list", list_path, "-segment_list_type", "csv",
+            "-output_ts_offset", f"{self.published_seconds:.3f}",
+            os.path.join(self.stream_dir, f"scene_{index:03d}_%03d.ts")
+        ]
+        done = subprocess.run(cmd, capture_output=True)
+        if done.returncode != 0:
+            raise RuntimeError(f"ffmpeg could not segment scene {index}: "
+                               f"{done.stderr.decode('utf-8', 'replace').strip()}")
+
+        with open(list_path, newline='', encoding='utf-8') as f:
+            for name, start, end in csv.reader(f):
+                seconds = float(end) - float(start)
+                self.entries.append((name, seconds))
+                self.published_seconds += seconds
+        os.remove(list_path)
+
+    def _write_playlist(self):
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{math.ceil(self.segment_seconds)}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:EVENT"
+        ]
+        for name, seconds in self.entries:
+            lines.append(f"#EXTINF:{seconds:.3f},")
+            lines.append(name)
+        if self.finished:
+            lines.append("#EXT-X-ENDLIST")
+
+        # Players re-read the playlist while it grows, so never expose a partial one
+        write_text(self.playlist_path, "\n".join(lines) + "\n")
+
+class _StreamHandler(SimpleHTTPRequestHandler):
+    extensions_map = {
+        **SimpleHTTPRequestHandler.extensions_map,
+        '.m3u8': 'application/vnd.apple.mpegurl',
+        '.ts': 'video/mp2t'
+    }
+
+    def end_headers(self):
+        # The player page is served by Streamlit on another port
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Cache-Control", "no-cache")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_streams(root, host="127.0.0.1", port=0):
+    """Serve a directory of progressive streams over HTTP from a daemon thread
+
+    Returns the server; its port is ``server.server_address[1]``.
+    """
+    os.makedirs(root, exist_ok=True)
+    handler = functools.partial(_StreamHandler, directory=root)
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def player_html(playlist_url, height=360):
+    """HTML for an HLS player that follows a growing playlist"""
+    return f"""
+<video id="player" controls autoplay muted style="width:100%;max-height:{height}px;background:#000"></video>
+<script src="https://cdn.jsdelivr.net/npm/hls.js@1"></script>
+<script>
+  const video = document.getElementById('player');
+  const src = "{playlist_url}";
+  if (video.canPlayType('application/vnd.apple.mpegurl')) {{
+    video.src = src;
+  }} else if (window.Hls && Hls.isSupported()) {{
+    const hls = new Hls({{liveDurationInfinity: false}});
+    hls.loadSource(src);
+    hls.attachMedia(video);
+  }}
+</script>
+"""
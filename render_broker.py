@@ -0,0 +1,147 @@
+import json
+import sqlite3
+import time
+from contextlib import closing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    job_id TEXT NOT NULL,
+    scene_index INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, scene_index)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires);
+"""
+
+class SQLiteBroker:
+    """Scene task queue with leases, backed by one SQLite file
+
+    Stands in for a real broker on a single machine or a shared
+    filesystem. A worker leases a task for a fixed time and must renew
+    the lease while it works; tasks whose lease runs out are handed to
+    the next worker that asks, up to max_attempts tries.
+    """
+
+    def __init__(self, db_path, max_attempts=3):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # Autocommit mode; writes that must be atomic open their own transaction
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def submit(self, job_id, tasks):
+        """Queue a job's scene tasks
+
+        Resubmitting a job keeps finished scenes whose payload is unchanged.
+        Failed scenes and scenes whose payload changed start over with a
+        fresh set of attempts, and scenes no longer in the job are dropped,
+        so a restarted coordinator resumes instead of replaying old work.
+        """
+        rows = [(job_id, task['index'], json.dumps(task)) for task in tasks]
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            existing = {index for (index,) in conn.execute(
+                "SELECT scene_index FROM tasks WHERE job_id = ?", (job_id,))}
+            stale = existing - {task['index'] for task in tasks}
+            conn.executemany("DELETE FROM tasks WHERE job_id = ? AND scene_index = ?",
+                             [(job_id, index) for index in stale])
+            # A changed payload also takes a lease away, so its old result can't be completed
+            restart = "(status = 'failed' OR payload != excluded.payload)"
+            conn.executemany(
+                "INSERT INTO tasks (job_id, scene_index, payload) VALUES (?, ?, ?) "
+                "ON CONFLICT (job_id, scene_index) DO UPDATE SET "
+                f"status = CASE WHEN {restart} THEN 'pending' ELSE status END, "
+                f"attempts = CASE WHEN {restart} THEN 0 ELSE attempts END, "
+                f"worker = CASE WHEN {restart} THEN NULL ELSE worker END, "
+                f"lease_expires = CASE WHEN {restart} THEN NULL ELSE lease_expires END, "
+                f"result = CASE WHEN {restart} THEN NULL ELSE result END, "
+                f"error = CASE WHEN {restart} THEN NULL ELSE error END, "
+                "payload = excluded.payload",
+                rows)
+            conn.execute("COMMIT")
+
+    def lease(self, worker_id, lease_seconds=120):
+        """Claim the next runnable task, or return None if there is none"""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Leases that ran out belong to dead or stuck workers
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = 'lease expired', worker = NULL, lease_expires = NULL "
+                "WHERE status = 'leased' AND lease_expires < ?",
+                (self.max_attempts, now))
+            row = conn.execute(
+                "SELECT job_id, scene_index, payload, attempts FROM tasks "
+                "WHERE status = 'pending' ORDER BY job_id, scene_index LIMIT 1").fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            job_id, scene_index, payload, attempts = row
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, attempts = ? "
+                "WHERE job_id = ? AND scene_index = ?",
+                (worker_id, now + lease_seconds, attempts + 1, job_id, scene_index))
+            conn.execute("COMMIT")
+        return {'job_id': job_id, 'index': scene_index, 'worker': worker_id,
+                'attempt': attempts + 1, 'payload': json.loads(payload)}
+
+    def renew(self, task, lease_seconds=120):
+        """Extend a lease; False means the task was taken away from this worker"""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ? "
+                "WHERE job_id = ? AND scene_index = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease_seconds, task['job_id'], task['index'], task['worker']))
+            return cursor.rowcount == 1
+
+    def complete(self, task, result):
+        """Mark a leased task done with its result"""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_expires = NULL "
+                "WHERE job_id = ? AND scene_index = ? AND worker = ? AND status = 'leased'",
+                (json.dumps(result), task['job_id'], task['index'], task['worker']))
+            return cursor.rowcount == 1
+
+    def fail(self, task, error):
+        """Release a task after an error, retrying it unless it is out of attempts"""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, worker = NULL, lease_expires = NULL "
+                "WHERE job_id = ? AND scene_index = ? AND worker = ? AND status = 'leased'",
+                (self.max_attempts, str(error), task['job_id'], task['index'], task['worker']))
+
+    def status(self, job_id):
+        """Count of a job's tasks in each state"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY status", (job_id,)).fetchall()
+        return dict(rows)
+
+    def results(self, job_id):
+        """Scene index -> result for a job's finished tasks"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT scene_index, result FROM tasks WHERE job_id = ? AND status = 'done'",
+                (job_id,)).fetchall()
+        return {index: json.loads(result) for index, result in rows}
+
+    def errors(self, job_id):
+        """Scene index -> last error for a job's failed tasks"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT scene_index, error FROM tasks WHERE job_id = ? AND status = 'failed'",
+                (job_id,)).fetchall()
+        return dict(rows)
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+from atomic_io import write_text
+
+def file_checksum(path, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class RenderCheckpoint:
+    """On-disk manifest of completed per-scene artifacts for one render"""
+
+    def __init__(self, scene_dir, script_key=None):
+        self.path = os.path.join(scene_dir, "manifest.json")
+        self.script_key = script_key
+        self.scenes = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Ignoring unreadable render manifest {self.path}: {e}")
+            return
+        # A different script means none of the old segments apply;
+        # without a key the manifest is opened read-only for whatever it holds
+        if self.script_key is None:
+            self.script_key = data.get('script_key')
+        if data.get('script_key') == self.script_key:
+            self.scenes = {int(k): v for k, v in data.get('scenes', {}).items()}
+
+    def save(self):
+        """Write the manifest atomically so a crash never leaves it half written"""
+        write_text(self.path, json.dumps({'script_key': self.script_key, 'scenes': self.scenes}, indent=2),
+                   fsync=True)
+
+    def is_complete(self, index, dialogue):
+        """Check a scene's recorded artifacts still exist and match their checksums"""
+        entry = self.scenes.get(index)
+        if not entry or entry.get('dialogue') != dialogue:
+            return False
+        for path_key, sum_key in (('audio_path', 'audio_sha256'), ('segment_path', 'segment_sha256')):
+            path = entry.get(path_key)
+            if not path or not os.path.exists(path) or file_checksum(path) != entry.get(sum_key):
+                return False
+        return True
+
+    def record(self, index, speaker, dialogue, audio_path, segment_path, duration, render_seconds):
+        """Record a finished scene and persist the manifest"""
+        self.scenes[index] = {
+            'speaker': speaker,
+            'dialogue': dialogue,
+            'audio_path': audio_path,
+            'audio_sha256': file_checksum(audio_path),
+            'segment_path': segment_path,
+            'segment_sha256': file_checksum(segment_path),
+            'duration': duration,
+            'render_seconds': render_seconds
+        }
+        self.save()
@@ -0,0 +1,307 @@
+import os
+import time
+import wave
+import json
+import hashlib
+import numpy as np
+from voice_generator import VoiceGenerator
+from background_generator import BackgroundGenerator
+from character_animator import CharacterAnimator
+from camera_controller import CameraController
+from video_composer import VideoComposer
+from caption_renderer import build_cues, write_srt, write_vtt
+from render_checkpoint import RenderCheckpoint
+from scene_planner import ScenePlanner
+from audio_conditioner import AudioConditioner
+from frame_cache import write_frame_cache
+
+def get_wav_duration(audio_path):
+    """Read the duration of a WAV file in seconds"""
+    try:
+        with wave.open(audio_path, 'rb') as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError, OSError):
+        return 0.0
+
+def frame_cache_path(segment_path):
+    """Frame cache kept next to a scene segment when rendering with keep_frames"""
+    return f"{os.path.splitext(segment_path)[0]}.frames"
+
+class RenderPipeline:
+    """Runs a parsed script through audio, background, animation and compositing"""
+
+    def __init__(self, voice_generator=None, bg_generator=None, animator=None,
+                 camera=None, composer=None, captions=None, conditioner=None,
+                 keep_frames=False, fps=24):
+        # Components are injectable so several pipelines can share caches
+        self.voice_generator = voice_generator or VoiceGenerator()
+        self.bg_generator = bg_generator or BackgroundGenerator()
+        self.animator = animator or CharacterAnimator()
+        self.camera = camera or CameraController()
+        self.composer = composer or VideoComposer()
+        # Optional CaptionRenderer; when set, dialogue is burned into frames
+        self.captions = captions
+        # Trims TTS silence and levels loudness before clip lengths are measured
+        self.conditioner = conditioner or AudioConditioner()
+        self.planner = ScenePlanner(self.bg_generator, self.camera)
+        # Also store each scene's composited frames so it can be re-encoded later
+        self.keep_frames = keep_frames
+        self.fps = fps
+
+    def _scene_shot(self, line, total, scene):
+        """Background and camera position for a line, from its scene plan if given"""
+        if scene is not None:
+            return scene.background, scene.shots[line.source_index]
+        bg_path = self.bg_generator.generate_scene_background(line.dialogue)
+        return bg_path, self.camera.get_camera_movement(line.index, total)
+
+    def _character_path(self, line, characters):
+        char_path = characters.get(line.speaker)
+        return char_path if char_path and os.path.exists(char_path) else None
+
+    def render_frames(self, line, total, characters, frame_count, scene=None, start=0):
+        """Composite frames [start, frame_count) of a line
+
+        A line without a character image is a single held frame, which
+        compose_scene loops to the audio length.
+        """
+        if start >= frame_count:
+            return []
+        bg_path, camera_pos = self._scene_shot(line, total, scene)
+        bg_img = self.bg_generator.load_background(bg_path)
+
+        char_path = self._character_path(line, characters)
+        if char_path:
+            char_frames = [self.animator.get_frame(char_path, line.dialogue, n)
+                           for n in range(start, frame_count)]
+            frames = self.camera.apply_camera_effect(bg_img, char_frames, camera_pos, plate_key=bg_path)
+        elif start == 0:
+            frames = [np.array(bg_img)]
+        else:
+            return []
+
+        if self.captions:
+            self.captions.overlay_frames(frames, line.dialogue)
+        return frames
+
+    def fit_frames(self, frames, line, total, characters, frame_count, scene=None):
+        """Pad or trim a line's frames in place to frame_count"""
+        if not self._character_path(line, characters):
+            return frames  # One held frame fits any length
+        if len(frames) > frame_count:
+            del frames[frame_count:]
+        else:
+            frames.extend(self.render_frames(line, total, characters, frame_count, scene, start=len(frames)))
+        return frames
+
+    def scene_frame_count(self, seconds):
+        """Frames rendered for a line of the given audio length"""
+        return int(max(seconds, 1.0) * self.fps)
+
+    def encode_scene(self, line, frames, output_path, temp_dir=None):
+        """Encode a line's frames with its audio into a video segment"""
+        if self.keep_frames:
+            write_frame_cache(frames, frame_cache_path(output_path),
+                              self.fps, line.audio_path)
+
+        try:
+            return self.composer.compose_scene(frames, line.audio_path, output_path,
+                                               fps=self.fps, temp_dir=temp_dir)
+        except Exception as e:
+            raise RuntimeError(f"Scene {line.index} failed to encode: {e}") from e
+
+    def render_scene(self, line, total, characters, output_path, scene=None, temp_dir=None):
+        """Render one dialogue line into a video segment"""
+        frame_count = self.scene_frame_count(get_wav_duration(line.audio_path))
+        frames = self.render_frames(line, total, characters, frame_count, scene)
+        return self.encode_scene(line, frames, output_path, temp_dir)
+
+    def synthesize(self, line, voice_id):
+        """Generate and condition a line's audio, setting line.audio_path"""
+        audio_path = self.voice_generator.generate_cached_audio(line.dialogue, voice_id)
+        if not audio_path:
+            return None
+        line.audio_path = self.conditioner.condition(audio_path, line.speaker)
+        return line.audio_path
+
+    def render_frame(self, line, total, characters, timestamp=0.0, scene=None):
+        """Render a single poster frame of a line without building the frame list"""
+        bg_path, camera_pos = self._scene_shot(line, total, scene)
+        bg_img = self.bg_generator.load_background(bg_path)
+
+        char_path = characters.get(line.speaker)
+        if char_path and os.path.exists(char_path):
+            # Same plate and sprite frames render_scene uses, for one frame only
+            plate = self.camera.prepare_plate(bg_img, camera_pos, plate_key=bg_path)
+            char_frame = self.animator.get_frame(char_path, line.dialogue, int(timestamp * self.fps))
+            frame = self.camera.composite_frame(plate, char_frame, camera_pos)
+        else:
+            frame = np.array(bg_img)
+
+        if self.captions:
+            self.captions.overlay(frame, line.dialogue)
+        return frame
+
+    def _prepare_episode(self, timeline, characters, voice_assignments, output_path):
+        """Select voiced lines, open their checkpoint and plan their scenes"""
+        scene_dir = f"{os.path.splitext(output_path)[0]}_scenes"
+        os.makedirs(scene_dir, exist_ok=True)
+
+        voiced = timeline.select(voice_assignments)
+        # One background per scene and one plate per scene shot, not per line
+        line_scenes = self.planner.selection_lookup(timeline, voiced)
+        script_key = hashlib.sha256(json.dumps({
+            'lines': [[line.speaker, line.dialogue] for line in voiced],
+            # Unvoiced lines can move a scene, so the plan is part of the key
+            'shots': [[line_scenes[line.index].setting, line_scenes[line.index].shots[line.source_index]]
+                      for line in voiced],
+            'voices': voice_assignments,
+            'characters': characters,
+            'captions': bool(self.captions),
+            'fps': self.fps
+        }, sort_keys=True).encode('utf-8')).hexdigest()
+        checkpoint = RenderCheckpoint(scene_dir, script_key)
+        return scene_dir, voiced, checkpoint, line_scenes
+
+    def _reuse_checkpointed(self, line, voiced, checkpoint):
+        """Adopt a segment a previous, interrupted render already finished"""
+        if not checkpoint.is_complete(line.index, line.dialogue):
+            return None
+        entry = checkpoint.scenes[line.index]
+        if self.keep_frames and not os.path.exists(frame_cache_path(entry['segment_path'])):
+            return None  # Rendered without keep_frames; render again so it can be re-encoded
+        line.audio_path = entry['audio_path']
+        voiced.set_duration(line.index, entry['duration'])
+        return entry['segment_path']
+
+    def finish_episode(self, voiced, segments, output_path, workspace=None):
+        """Merge finished segments in line order and write caption sidecars"""
+        rendered = [voiced[i] for i in sorted(segments)]
+        scene_paths = [segments[i] for i in sorted(segments)]
+
+        base = os.path.splitext(output_path)[0]
+        final_paths = [output_path, f"{base}.srt", f"{base}.vtt"]
+        if workspace:
+            # The merged video is about the size of its segments; keep it off RAM if that won't fit
+            merged_size = sum(os.path.getsize(path) for path in scene_paths if os.path.exists(path))
+            write_paths = [workspace.path(os.path.basename(output_path), merged_size)]
+            write_paths += [workspace.path(os.path.basename(path)) for path in final_paths[1:]]
+        else:
+            write_paths = final_paths
+
+        temp_dir = workspace.subdir("compose") if workspace else None
+        try:
+            result = self.composer.merge_scenes(scene_paths, write_paths[0], temp_dir)
+        except Exception as e:
+            # Segments stay checkpointed, so a rerun only repeats the merge
+            raise RuntimeError(f"Merging {len(scene_paths)} scenes into {output_path} failed: {e}") from e
+        if result:
+            cues = build_cues([line.dialogue for line in rendered], [line.duration for line in rendered])
+            write_srt(cues, write_paths[1])
+            write_vtt(cues, write_paths[2])
+            if workspace:
+                for scratch_path, final_path in zip(write_paths, final_paths):
+                    workspace.promote(scratch_path, final_path)
+                result = output_path
+        return {
+            'output_path': result,
+            'scenes': len(scene_paths),
+            'video_seconds': sum(line.duration for line in rendered),
+            'timeline': voiced
+        }
+
+    def render_episode(self, timeline, characters, voice_assignments, output_path, workspace=None,
+                       progressive=None):
+        """Render a whole script timeline into one video, returning a summary dict
+
+        With a JobWorkspace, temporary encodes and the merged video are
+        written to its scratch and only promoted to output_path when the
+        job succeeds. Scene segments stay next to the output either way,
+        since they are the checkpoint a restarted render resumes from.
+        With a ProgressiveWriter, each scene is also published to its
+        playlist as soon as it is done, so playback can start early.
+        """
+        temp_dir = workspace.subdir("compose") if workspace else None
+        scene_dir, voiced, checkpoint, line_scenes = self._prepare_episode(
+            timeline, characters, voice_assignments, output_path)
+        prepared = set()
+        segments = {}
+        if progressive:
+            progressive.begin([line.index for line in voiced])
+
+        try:
+            for line in voiced:
+                i = line.index
+                segment = self._reuse_checkpointed(line, voiced, checkpoint)
+                if segment:
+                    segments[i] = segment
+                    if progressive:
+                        progressive.add(i, segment)
+                    continue
+
+                if not self.synthesize(line, voice_assignments[line.speaker]):
+                    if progressive:
+                        progressive.skip(i)
+                    continue
+
+                scene = line_scenes[i]
+                if scene.index not in prepared:
+                    self.planner.prepare_plates(scene)
+                    prepared.add(scene.index)
+
+                scene_path = os.path.join(scene_dir, f"scene_{i:03d}.mp4")
+                start = time.perf_counter()
+                if not self.render_scene(line, len(voiced), characters, scene_path, scene, temp_dir):
+                    # Stop here; the checkpoint lets the next run resume from this scene
+                    raise RuntimeError(f"Scene {i} failed to render: {line.dialogue[:50]}")
+
+                # compose_scene cuts each segment to its audio length
+                voiced.set_duration(i, get_wav_duration(line.audio_path))
+                checkpoint.record(i, line.speaker, line.dialogue, line.audio_path, scene_path,
+                                  line.duration, time.perf_counter() - start)
+                segments[i] = scene_path
+                if progressive:
+                    progressive.add(i, scene_path)
+        finally:
+            # Close the playlist even when a scene fails, so players stop polling
+            if progressive:
+                progressive.finish()
+        return self.finish_episode(voiced, segments, output_path, workspace)
+
+    def reencode_episode(self, output_path, new_output_path, size=None, codec='libx264', workspace=None):
+        """Re-encode a rendered episode from its frame caches, without re-rendering"""
+        scene_dir = f"{os.path.splitext(output_path)[0]}_scenes"
+        checkpoint = RenderCheckpoint(scene_dir)
+        # Re-encoded scenes, and then their merge, each come to about the original segments' size
+        episode_size = sum(os.path.getsize(entry['segment_path']) for entry in checkpoint.scenes.values()
+                           if os.path.exists(entry['segment_path']))
+        temp_dir = workspace.subdir("compose") if workspace else None
+        encode_dir = workspace.subdir("reencode", episode_size) if workspace else scene_dir
+
+        scene_paths = []
+        for index in sorted(checkpoint.scenes):
+            entry = checkpoint.scenes[index]
+            cache_path = frame_cache_path(entry['segment_path'])
+            if not os.path.exists(cache_path):
+                raise RuntimeError(f"Scene {index} has no frame cache; render with keep_frames=True")
+
+            scene_path = os.path.join(encode_dir, f"reencode_{index:03d}.mp4")
+            try:
+                encoded = self.composer.encode_frame_cache(cache_path, scene_path, entry['audio_path'],
+                                                           size=size, codec=codec, temp_dir=temp_dir)
+            except Exception as e:
+                raise RuntimeError(f"Scene {index} failed to re-encode: {e}") from e
+            if not encoded:
+                raise RuntimeError(f"Scene {index} failed to re-encode")
+            scene_paths.append(scene_path)
+
+        merged_path = new_output_path
+        if workspace:
+            merged_path = workspace.path(os.path.basename(new_output_path), episode_size)
+        try:
+            merged = self.composer.merge_scenes(scene_paths, merged_path, temp_dir)
+        except Exception as e:
+            raise RuntimeError(f"Merging {len(scene_paths)} scenes into {new_output_path} failed: {e}") from e
+        if workspace:
+            return workspace.promote(merged, new_output_path) if merged else None
+        return merged
@@ -0,0 +1,68 @@
+import re
+from timeline import Scene
+
+class ScenePlanner:
+    """Group consecutive script lines into scenes that share a background"""
+
+    def __init__(self, bg_generator, camera):
+        self.bg_generator = bg_generator
+        self.camera = camera
+
+    def build_keyword_index(self):
+        """Compile every location keyword into a single pattern"""
+        keyword_settings = {}
+        for setting, keywords in self.bg_generator.SETTING_KEYWORDS.items():
+            for keyword in keywords:
+                keyword_settings.setdefault(keyword, setting)
+        # Longest first so overlapping keywords match the most specific one
+        alternation = '|'.join(re.escape(k) for k in sorted(keyword_settings, key=len, reverse=True))
+        return re.compile(alternation), keyword_settings
+
+    def plan(self, timeline):
+        """Split the script into scenes, one background per scene
+
+        A line that names a location starts a new scene when the location
+        changes; lines without location keywords stay in the current scene.
+        """
+        pattern, keyword_settings = self.build_keyword_index()
+        priority = list(self.bg_generator.SETTING_KEYWORDS)
+        total = len(timeline)
+
+        scenes = []
+        current = None
+        for i, line in enumerate(timeline):
+            found = {keyword_settings[m] for m in pattern.findall(line.dialogue.lower())}
+            setting = next((s for s in priority if s in found), None)
+
+            if current is None or (setting and setting != current.setting):
+                current = Scene(len(scenes), setting or "neutral")
+                scenes.append(current)
+
+            current.lines.append(i)
+            current.shots[i] = self.camera.get_camera_movement(i, total)
+
+        for scene in scenes:
+            scene.background = self.bg_generator.generate_setting_background(scene.setting)
+        timeline.scenes = scenes
+        return scenes
+
+    def prepare_plates(self, scene):
+        """Build each shot plate of a scene once, ahead of rendering its lines"""
+        bg_img = self.bg_generator.load_background(scene.background)
+        for camera_pos in set(scene.shots.values()):
+            self.camera.prepare_plate(bg_img, camera_pos, plate_key=scene.background)
+        return scene
+
+    def scene_lookup(self, scenes):
+        """Map each line index to the scene that contains it"""
+        return {i: scene for scene in scenes for i in scene.lines}
+
+    def selection_lookup(self, timeline, selection):
+        """Plan the whole script, then map each line of a selection to its scene
+
+        Unvoiced lines such as the narrator's still set the location, so
+        planning happens on the full timeline and selected lines are
+        matched back through their source index.
+        """
+        lookup = self.scene_lookup(self.plan(timeline))
+        return {line.index: lookup[line.source_index] for line in selection}
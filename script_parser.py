@@ -0,0 +1,108 @@
+import re
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from timeline import Timeline
+
+def load_characters(characters_dir="characters"):
+    """Load character images from characters folder"""
+    characters_dir = Path(characters_dir)
+    characters_dir.mkdir(exist_ok=True)
+    
+    characters = {}
+    for img_file in characters_dir.glob("*"):
+        if img_file.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif']:
+            char_name = img_file.stem.lower()
+            characters[char_name] = str(img_file)
+    
+    return characters
+
+def parse_line(line):
+    """Identify the speaker and dialogue of one stripped script line"""
+    # Pattern 1: "Hi, I'm John" - extract speaker from dialogue
+    if "I'm" in line or "I am" in line:
+        name_match = re.search(r"I[''`]?m\s+([A-Z][a-z]+)", line)
+        if name_match:
+            return name_match.group(1).lower(), line
+    
+    # Pattern 2: "Sarah replied:" or "John said:"
+    speaker_match = re.search(r'([A-Z][a-z]+)\s+(replied|said):', line)
+    if speaker_match:
+        speaker = speaker_match.group(1).lower()
+        dialogue = re.sub(r'^[^:]+:\s*', '', line).strip()
+        return speaker, dialogue
+    
+    # Pattern 3: "Sarah: dialogue"
+    colon_match = re.search(r'^([A-Z][a-z]+):\s*(.+)', line)
+    if colon_match:
+        return colon_match.group(1).lower(), colon_match.group(2).strip()
+    
+    # Default: treat as narrator
+    return 'narrator', line
+
+def parse_script(script_text, fps=24):
+    """Parse script to identify speakers and dialogue"""
+    timeline = Timeline(fps)
+    
+    for line in script_text.strip().split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        
+        speaker, dialogue = parse_line(line)
+        timeline.add_line(speaker, dialogue, line)
+    
+    return timeline
+
+class ScriptParseCache:
+    """Memoized parse_script that only re-parses the lines that changed
+
+    Whole scripts are memoized by digest. On a miss, the new text is diffed
+    against the previous one by common prefix and suffix, and only the
+    lines in between go through parse_line again.
+    """
+    
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._timelines = OrderedDict()
+        self._raw_lines = []
+        self._parsed = []  # (speaker, dialogue, line) per raw line, None if blank
+    
+    def parse(self, script_text, fps=24):
+        """Return the Timeline for script_text, reusing earlier work"""
+        digest = hashlib.sha1(f"{fps}|{script_text}".encode('utf-8')).hexdigest()
+        timeline = self._timelines.get(digest)
+        if timeline is not None:
+            self._timelines.move_to_end(digest)
+            return timeline
+        
+        raw_lines = script_text.strip().split('\n')
+        old_lines = self._raw_lines
+        
+        # Lines outside the edited range keep their previous parse
+        prefix = 0
+        limit = min(len(raw_lines), len(old_lines))
+        while prefix < limit and raw_lines[prefix] == old_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while (suffix < limit - prefix
+               and raw_lines[-1 - suffix] == old_lines[-1 - suffix]):
+            suffix += 1
+        
+        changed = []
+        for raw in raw_lines[prefix:len(raw_lines) - suffix]:
+            line = raw.strip()
+            changed.append((*parse_line(line), line) if line else None)
+        parsed = self._parsed[:prefix] + changed + self._parsed[len(old_lines) - suffix:]
+        
+        timeline = Timeline(fps)
+        for entry in parsed:
+            if entry is not None:
+                timeline.add_line(*entry)
+        
+        self._raw_lines = raw_lines
+        self._parsed = parsed
+        self._timelines[digest] = timeline
+        if len(self._timelines) > self.max_entries:
+            self._timelines.popitem(last=False)
+        return timeline
@@ -0,0 +1,173 @@
+import json
+import sys
+
+class Line:
+    """One spoken line of a script"""
+    __slots__ = ('index', 'source_index', 'speaker_id', 'speaker', 'dialogue', 'original_line',
+                 'audio_path', 'duration', 'start_frame', 'frame_count')
+
+    def __init__(self, index, speaker_id, speaker, dialogue, original_line=None):
+        self.index = index
+        # Index in the full script this line was selected from
+        self.source_index = index
+        self.speaker_id = speaker_id
+        self.speaker = speaker
+        self.dialogue = dialogue
+        # Most lines are their own original text; share the string then
+        self.original_line = dialogue if original_line is None or original_line == dialogue else original_line
+        self.audio_path = None
+        self.duration = None
+        # Kept current by Timeline.refresh_offsets()
+        self.start_frame = 0
+        self.frame_count = 0
+
+    def __repr__(self):
+        return f"Line({self.index}, {self.speaker!r}, {self.dialogue[:30]!r})"
+
+class Scene:
+    """Consecutive lines that share one setting and background"""
+    __slots__ = ('index', 'setting', 'background', 'lines', 'shots')
+
+    def __init__(self, index, setting, background=None):
+        self.index = index
+        self.setting = setting
+        self.background = background
+        self.lines = []   # Line indexes in the timeline
+        self.shots = {}   # Line index -> camera position
+
+class Timeline:
+    """Ordered script lines with interned speakers, timing and scene plan"""
+    __slots__ = ('fps', 'lines', 'speakers', 'by_speaker', 'scenes', '_speaker_ids', '_dirty_from')
+
+    def __init__(self, fps=24):
+        self.fps = fps
+        self.lines = []
+        self.speakers = []      # Speaker id -> name, in order of first appearance
+        self.by_speaker = {}    # Speaker name -> line indexes
+        self.scenes = []
+        self._speaker_ids = {}
+        # First line whose start_frame may be stale; None when all are current
+        self._dirty_from = None
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __getitem__(self, index):
+        return self.lines[index]
+
+    def __bool__(self):
+        return bool(self.lines)
+
+    def add_line(self, speaker, dialogue, original_line=None):
+        """Append a line, interning its speaker"""
+        speaker_id = self._speaker_ids.get(speaker)
+        if speaker_id is None:
+            speaker = sys.intern(speaker)
+            speaker_id = len(self.speakers)
+            self._speaker_ids[speaker] = speaker_id
+            self.speakers.append(speaker)
+            self.by_speaker[speaker] = []
+
+        speaker = self.speakers[speaker_id]
+        line = Line(len(self.lines), speaker_id, speaker, dialogue, original_line)
+        self.lines.append(line)
+        self.by_speaker[speaker].append(line.index)
+        self._mark_dirty(line.index)
+        return line
+
+    def select(self, speakers):
+        """New timeline holding only the lines spoken by the given speakers"""
+        subset = Timeline(self.fps)
+        for line in self.lines:
+            if line.speaker in speakers:
+                new_line = subset.add_line(line.speaker, line.dialogue, line.original_line)
+                new_line.source_index = line.source_index
+                new_line.audio_path = line.audio_path
+                if line.duration is not None:
+                    subset.set_duration(new_line.index, line.duration)
+        return subset
+
+    def _mark_dirty(self, index):
+        if self._dirty_from is None or index < self._dirty_from:
+            self._dirty_from = index
+
+    def set_duration(self, index, seconds):
+        """Set a line's duration; later frame offsets are refreshed lazily"""
+        line = self.lines[index]
+        line.duration = seconds
+        line.frame_count = int(round(seconds * self.fps))
+        self._mark_dirty(index + 1)
+
+    def refresh_offsets(self):
+        """Recompute start frames from the first stale line onwards"""
+        if self._dirty_from is None:
+            return
+        start = self._dirty_from
+        frame = 0
+        if start > 0:
+            prev = self.lines[start - 1]
+            frame = prev.start_frame + prev.frame_count
+        for line in self.lines[start:]:
+            line.start_frame = frame
+            frame += line.frame_count
+        self._dirty_from = None
+
+    @property
+    def total_frames(self):
+        if not self.lines:
+            return 0
+        self.refresh_offsets()
+        last = self.lines[-1]
+        return last.start_frame + last.frame_count
+
+    @property
+    def total_seconds(self):
+        return self.total_frames / self.fps
+
+    def line_at_frame(self, frame):
+        """Line playing at a frame, found by binary search over start frames"""
+        self.refresh_offsets()
+        lo, hi = 0, len(self.lines) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.lines[mid].start_frame <= frame:
+                lo = mid
+            else:
+                hi = mid - 1
+        return self.lines[lo] if self.lines else None
+
+    def to_dict(self):
+        """Compact JSON-ready form: a speaker table plus one row per line"""
+        rows = []
+        for line in self.lines:
+            original = None if line.original_line is line.dialogue else line.original_line
+            rows.append([line.speaker_id, line.dialogue, original, line.audio_path, line.duration])
+        scenes = [[s.index, s.setting, s.background, s.lines, [s.shots[i] for i in s.lines]]
+                  for s in self.scenes]
+        return {'fps': self.fps, 'speakers': self.speakers, 'lines': rows, 'scenes': scenes}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), separators=(',', ':'))
+
+    @classmethod
+    def from_dict(cls, data):
+        timeline = cls(data.get('fps', 24))
+        speakers = data['speakers']
+        for speaker_id, dialogue, original, audio_path, duration in data['lines']:
+            line = timeline.add_line(speakers[speaker_id], dialogue, original)
+            line.audio_path = audio_path
+            if duration is not None:
+                timeline.set_duration(line.index, duration)
+        for index, setting, background, line_indexes, shots in data.get('scenes', []):
+            scene = Scene(index, setting, background)
+            scene.lines = list(line_indexes)
+            scene.shots = dict(zip(line_indexes, shots))
+            timeline.scenes.append(scene)
+        return timeline
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
@@ -1,15 +1,29 @@
 import cv2
 import numpy as np
-from moviepy.editor import VideoFileClip, AudioFileClip, CompositeVideoClip
+from moviepy.editor import VideoFileClip, AudioFileClip, concatenate_videoclips
 import os
 from PIL import Image
+from frame_cache import FrameCache
 
 class VideoComposer:
     def __init__(self):
         self.output_dir = "output"
         os.makedirs(self.output_dir, exist_ok=True)
     
-    def compose_scene(self, background_frames, audio_path, output_path, fps=24):
+    def _temp_path(self, output_path, temp_dir=None):
+        # Derive the temp file from the output so parallel scenes don't collide
+        temp_name = f"{os.path.splitext(os.path.basename(output_path))[0]}_temp.mp4"
+        if temp_dir:
+            return os.path.join(temp_dir, temp_name)
+        return os.path.join(os.path.dirname(output_path), temp_name)
+    
+    def _temp_audio_path(self, output_path, temp_dir=None):
+        # moviepy otherwise puts its temp audio in the working directory,
+        # named after the output, where concurrent jobs overwrite each other's
+        temp_name = f"{os.path.splitext(os.path.basename(output_path))[0]}_temp_audio.m4a"
+        return os.path.join(temp_dir or os.path.dirname(output_path), temp_name)
+    
+    def compose_scene(self, background_frames, audio_path, output_path, fps=24, temp_dir=None):
         """Compose final scene with background and audio"""
         if not background_frames or not os.path.exists(audio_path):
             return None
@@ -17,7 +31,7 @@ class VideoComposer:
         # Create video from frames
         height, width = background_frames[0].shape[:2]
         fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        temp_video = "temp_video.mp4"
+        temp_video = self._temp_path(output_path, temp_dir)
         
         out = cv2.VideoWriter(temp_video, fourcc, fps, (width, height))
         
@@ -27,10 +41,22 @@ class VideoComposer:
         
         out.release()
         
+        return self.mux_audio(temp_video, audio_path, output_path, temp_dir=temp_dir)
+    
+    def mux_audio(self, temp_video, audio_path, output_path, codec='libx264',
+                  audio_start=0, audio_end=None, temp_dir=None):
+        """Fit a silent temp video to its audio, write the result and remove the temp
+
+        Encoding errors are raised after the temp is removed.
+        """
         # Combine with audio using moviepy
         try:
             video_clip = VideoFileClip(temp_video)
             audio_clip = AudioFileClip(audio_path)
+            if audio_start or audio_end is not None:
+                if audio_end is not None:
+                    audio_end = min(audio_end, audio_clip.duration)
+                audio_clip = audio_clip.subclip(audio_start, audio_end)
             
             # Match video duration to audio
             if video_clip.duration < audio_clip.duration:
@@ -41,7 +67,8 @@ class VideoComposer:
                 video_clip = video_clip.subclip(0, audio_clip.duration)
             
             final_clip = video_clip.set_audio(audio_clip)
-            final_clip.write_videofile(output_path, codec='libx264', audio_codec='aac')
+            final_clip.write_videofile(output_path, codec=codec, audio_codec='aac',
+                                       temp_audiofile=self._temp_audio_path(output_path, temp_dir))
             
             # Cleanup
             video_clip.close()
@@ -53,31 +80,68 @@ class VideoComposer:
             
             return output_path
             
-        except Exception as e:
-            print(f"Error composing video: {e}")
+        except Exception:
+            # Leave no temp behind, but let the caller see why the encode failed
             if os.path.exists(temp_video):
                 os.remove(temp_video)
+            raise
+    
+    def encode_frame_cache(self, cache_path, output_path, audio_path=None, size=None,
+                           start=0, end=None, codec='libx264', temp_dir=None):
+        """Encode a scene straight from its frame cache, without re-rendering"""
+        cache = FrameCache(cache_path)
+        audio_path = audio_path or cache.meta.get('audio_path')
+        if not len(cache) or not audio_path or not os.path.exists(audio_path):
+            cache.close()
             return None
+        
+        width, height = size or (cache.meta['width'], cache.meta['height'])
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        temp_video = self._temp_path(output_path, temp_dir)
+        out = cv2.VideoWriter(temp_video, fourcc, cache.fps, (width, height))
+        
+        # Frames are already BGR; each unique frame is resized at most once
+        for frame, count in cache.iter_runs(start, end):
+            if size:
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            for _ in range(count):
+                out.write(frame)
+        
+        out.release()
+        fps = cache.fps
+        cache.close()
+        
+        return self.mux_audio(temp_video, audio_path, output_path, codec=codec,
+                              audio_start=start / fps,
+                              audio_end=end / fps if end is not None else None,
+                              temp_dir=temp_dir)
     
-    def merge_scenes(self, scene_paths, output_path):
-        """Merge multiple scenes into final video"""
+    def merge_scenes(self, scene_paths, output_path, temp_dir=None):
+        """Merge multiple scenes into final video
+
+        Encoding errors are raised after any partial output is removed.
+        """
         if not scene_paths:
             return None
         
+        clips = [VideoFileClip(path) for path in scene_paths if os.path.exists(path)]
+        if not clips:
+            return None
+        
         try:
-            clips = [VideoFileClip(path) for path in scene_paths if os.path.exists(path)]
-            if not clips:
-                return None
-            
-            final_video = CompositeVideoClip(clips, method='compose')
-            final_video.write_videofile(output_path, codec='libx264', audio_codec='aac')
-            
-            for clip in clips:
-                clip.close()
+            final_video = concatenate_videoclips(clips, method='compose')
+            final_video.write_videofile(output_path, codec='libx264', audio_codec='aac',
+                                        temp_audiofile=self._temp_audio_path(output_path, temp_dir))
             final_video.close()
             
             return output_path
             
-        except Exception as e:
-            print(f"Error merging scenes: {e}")
-            return None
\ No newline at end of file
+        except Exception:
+            # Leave no half-written video behind, but let the caller see why the merge failed
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
+        
+        finally:
+            for clip in clips:
+                clip.close()
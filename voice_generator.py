@@ -1,6 +1,8 @@
 import pyttsx3
-import os
+import hashlib
+import threading
 from pathlib import Path
+from atomic_io import atomic_write
 import streamlit as st
 
 class VoiceGenerator:
@@ -9,6 +11,8 @@ class VoiceGenerator:
         self.voices = self.engine.getProperty('voices')
         self.output_dir = Path("audio")
         self.output_dir.mkdir(exist_ok=True)
+        # pyttsx3 engines are not thread-safe, so all synthesis is serialized
+        self._lock = threading.Lock()
     
     def get_available_voices(self):
         """Get list of available voices"""
@@ -37,17 +41,14 @@ class VoiceGenerator:
             st.error(f"Error generating audio: {e}")
             return None
     
-    def generate_script_audio(self, parsed_script, voice_assignments):
+    def generate_script_audio(self, timeline, voice_assignments):
         """Generate audio for entire script"""
         audio_files = []
         
-        for i, item in enumerate(parsed_script):
-            speaker = item['speaker']
-            dialogue = item['dialogue']
-            
-            if speaker in voice_assignments:
-                voice_id = voice_assignments[speaker]
-                filename = f"{i:03d}_{speaker}"
+        for line in timeline:
+            if line.speaker in voice_assignments:
+                voice_id = voice_assignments[line.speaker]
+                filename = f"{line.index:03d}_{line.speaker}"
                 
                 # Set voice properties once per speaker
                 self.engine.setProperty('voice', voice_id)
@@ -55,15 +56,35 @@ class VoiceGenerator:
                 self.engine.setProperty('volume', 0.9)
                 
                 output_path = self.output_dir / f"{filename}.wav"
-                self.engine.save_to_file(dialogue, str(output_path))
+                self.engine.save_to_file(line.dialogue, str(output_path))
                 self.engine.runAndWait()
                 
                 if output_path.exists():
-                    audio_files.append({
-                        'speaker': speaker,
-                        'dialogue': dialogue,
-                        'audio_path': str(output_path),
-                        'order': i
-                    })
+                    line.audio_path = str(output_path)
+                    audio_files.append(line)
+        
+        return audio_files
+    
+    def generate_cached_audio(self, text, voice_id, rate=180, volume=0.9):
+        """Generate audio keyed by content so repeated lines are synthesized once"""
+        key = f"{voice_id}|{rate}|{volume}|{text}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        output_path = self.output_dir / f"tts_{digest}.wav"
+        
+        with self._lock:
+            if output_path.exists() and output_path.stat().st_size > 0:
+                return str(output_path)
+            
+            # Synthesize under a temp name so other jobs never read a partial file
+            try:
+                with atomic_write(str(output_path), suffix=".wav") as tmp_path:
+                    self.engine.setProperty('voice', voice_id)
+                    self.engine.setProperty('rate', rate)
+                    self.engine.setProperty('volume', volume)
+                    self.engine.save_to_file(text, tmp_path)
+                    self.engine.runAndWait()
+            except Exception as e:
+                print(f"Error generating audio: {e}")
+                return None
         
-        return audio_files
\ No newline at end of file
+        return str(output_path) if output_path.exists() else None
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import threading
+from atomic_io import atomic_write
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass  # Removed while we were walking it
+    return total
+
+class JobWorkspace:
+    """Private scratch directory for one render job
+
+    Scratch lives on tmpfs (/dev/shm) when available and spills to the
+    regular temp directory for files that would take it past ``ram_limit``
+    bytes; callers pass the expected size of large outputs such as a
+    merged episode so the choice is made before the file is written.
+    Artifacts registered with ``promote`` are moved to their final paths
+    when the job succeeds; scratch is removed either way. Use it as a
+    context manager so a failing job cleans up after itself.
+    """
+
+    def __init__(self, job_id="job", ram_limit=2 * 1024 ** 3, ram_root="/dev/shm"):
+        self.job_id = job_id
+        self.ram_limit = ram_limit
+        self.ram_dir = None
+        self.disk_dir = None
+        self._promotions = []
+        self._lock = threading.Lock()
+
+        prefix = f"ytgen_{job_id}_"
+        if os.path.isdir(ram_root) and os.access(ram_root, os.W_OK):
+            if shutil.disk_usage(ram_root).free > ram_limit:
+                self.ram_dir = tempfile.mkdtemp(prefix=prefix, dir=ram_root)
+        if self.ram_dir is None:
+            self.disk_dir = tempfile.mkdtemp(prefix=prefix)
+        self._prefix = prefix
+
+    def _scratch_root(self, expected_size=0):
+        """RAM scratch while it has room for expected_size more bytes, disk scratch after"""
+        if self.ram_dir:
+            used = _dir_size(self.ram_dir)
+            if (used + expected_size < self.ram_limit
+                    and shutil.disk_usage(self.ram_dir).free > expected_size):
+                return self.ram_dir
+        with self._lock:
+            if self.disk_dir is None:
+                self.disk_dir = tempfile.mkdtemp(prefix=self._prefix)
+        return self.disk_dir
+
+    def subdir(self, name, expected_size=0):
+        """Create (if needed) and return a scratch subdirectory
+
+        expected_size is the most the caller will write there at once; the
+        directory is placed on disk if that would not fit in RAM.
+        """
+        path = os.path.join(self._scratch_root(expected_size), name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def path(self, name, expected_size=0):
+        """Return a scratch file path, on disk if expected_size won't fit in RAM"""
+        path = os.path.join(self._scratch_root(expected_size), name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def promote(self, scratch_path, final_path):
+        """Move scratch_path to final_path once the job succeeds"""
+        with self._lock:
+            self._promotions.append((scratch_path, final_path))
+        return final_path
+
+    def commit(self):
+        """Move promoted artifacts to their persistent paths, then clean up"""
+        try:
+            for scratch_path, final_path in self._promotions:
+                os.makedirs(os.path.dirname(final_path) or ".", exist_ok=True)
+                # Copy next to the destination first so the final rename is atomic
+                with atomic_write(final_path) as tmp_path:
+                    shutil.move(scratch_path, tmp_path)
+        finally:
+            self.discard()
+
+    def discard(self):
+        """Remove all scratch without promoting anything"""
+        self._promotions = []
+        for path in (self.ram_dir, self.disk_dir):
+            if path:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False